@@ -3,12 +3,13 @@ import asyncio
 import logging
 
 # Import refactored components
-from src.config import validate_api_keys
-from src.models import KnowledgeGraph
-from src.persistence import load_kg, save_kg, load_chat_history, save_chat_history
+from src.config import validate_api_keys, PARTIAL_COMMIT_MODE
+from src.models import KnowledgeGraph, PendingEdges
+from src.persistence import load_kg, load_chat_history, save_chat_history, load_pending_edges, save_pending_edges
 from src.services import DeepgramService, InstructorService
-from src.kg_utils import merge_confirmed_data
-from streamlit_components.core_processing import process_audio_story
+from src.kg_utils import merge_confirmed_data_with_delta, resolve_pending_edges
+from src.analytics import GraphAnalytics
+from streamlit_components.core_processing import process_audio_story, prefetch_audio_story, commit_knowledge_graph, undo_knowledge_graph, discard_speculative_work, get_graph_history
 
 # --- Initialize Service Classes ---
 deepgram_service = DeepgramService()
@@ -34,9 +35,12 @@ st.title("🎙️ Personal Rolodex via Stories")
 default_values = {
     'chat_history': load_chat_history,
     'knowledge_graph': load_kg,
+    'pending_edges': load_pending_edges, # Edges waiting on new-person confirmation (survives restarts)
     'processing': False,
     'needs_confirmation': False,
     'extracted_data_buffer': None,
+    'speculative_buffer': None, # Speculative result whose candidate graph assumes every new person is confirmed
+    'graph_revision': 0, # Bumped on every change to knowledge_graph, so results computed against an older graph can be told apart
     'new_persons_buffer': list,
     'uploaded_file_key': 0, # To help reset file uploader
     'current_file_processed': False, # Flag to prevent reprocessing the same file
@@ -56,18 +60,67 @@ st.sidebar.header("Knowledge Graph")
 kg_display_data = st.session_state.knowledge_graph.model_dump() if st.session_state.knowledge_graph else {}
 st.sidebar.json(kg_display_data, expanded=False)
 
+# Rolodex insights, kept in sync incrementally with each merge
+if 'graph_analytics' not in st.session_state:
+    st.session_state.graph_analytics = GraphAnalytics()
+st.session_state.graph_analytics.sync(st.session_state.knowledge_graph)
+with st.sidebar.expander("Insights"):
+    analytics = st.session_state.graph_analytics
+    most_connected = analytics.most_connected(top_n=5)
+    if most_connected:
+        st.markdown("**Most connected:** " + ", ".join(f"{person_id} ({degree})" for person_id, degree in most_connected))
+        circles = [group for group in analytics.connected_components() if len(group) > 1]
+        st.markdown(f"**Circles:** {len(circles)}")
+        bridges = analytics.bridges()
+        if bridges:
+            st.markdown("**Bridges between groups:** " + ", ".join(bridges))
+    else:
+        st.caption("No people in the rolodex yet.")
+
+# Version history: undo recent merges or restore an older version
+history = get_graph_history()
+with st.sidebar.expander("History"):
+    st.caption(f"Version {history.head_version} (oldest retained: {history.base_version})")
+    for entry in history.entries(limit=5):
+        if entry.kind == "merge" and entry.delta is not None:
+            summary = f"+{len(entry.delta.persons)} people, +{len(entry.delta.events)} events, +{len(entry.delta.relationships)} relationships"
+        else:
+            summary = "graph replaced"
+        st.markdown(f"- v{entry.version} · {entry.timestamp:%Y-%m-%d %H:%M} · {summary}")
+
+    undoable = history.head_version - history.base_version
+    if undoable > 0:
+        undo_steps = st.number_input("Merges to undo", min_value=1, max_value=undoable, value=1, step=1)
+        if st.button("Undo"):
+            undo_knowledge_graph(int(undo_steps))
+            logging.info(f"Undid {undo_steps} version(s); now at version {history.head_version}.")
+            st.rerun()
+
+        restore_version = st.number_input("Restore version", min_value=history.base_version, max_value=history.head_version, value=history.head_version, step=1)
+        if restore_version != history.head_version:
+            changes = history.diff(int(restore_version), history.head_version)
+            st.caption(f"Since then: +{len(changes.added.persons)} people, +{len(changes.added.relationships)} relationships, "
+                       f"-{len(changes.removed.persons)} people, -{len(changes.removed.relationships)} relationships")
+            if st.button("Restore"):
+                discard_speculative_work()
+                commit_knowledge_graph(history.checkout(int(restore_version))) # Restoring is itself a new, undoable version
+                logging.info(f"Restored knowledge graph to version {restore_version}.")
+                st.rerun()
+
 # Add a button to clear the knowledge graph and chat history
 if st.sidebar.button("Clear All Data"):
     # Reset knowledge graph
-    st.session_state.knowledge_graph = KnowledgeGraph()
-    save_kg(st.session_state.knowledge_graph)
+    commit_knowledge_graph(KnowledgeGraph()) # Recorded as a version, so even a clear can be undone
     # Reset chat history
     st.session_state.chat_history = []
     save_chat_history(st.session_state.chat_history)
     # Reset other state
     st.session_state.needs_confirmation = False
     st.session_state.extracted_data_buffer = None
+    discard_speculative_work()
     st.session_state.new_persons_buffer = []
+    st.session_state.pending_edges = PendingEdges()
+    save_pending_edges(st.session_state.pending_edges)
     st.session_state.processing = False
     st.session_state.uploaded_file_key += 1
     logging.info("All data cleared by user.")
@@ -84,11 +137,19 @@ for message in st.session_state.chat_history:
         st.markdown(content)
 
 # --- Confirmation Form (Conditional Display) ---
-if st.session_state.needs_confirmation and st.session_state.new_persons_buffer:
+# In partial-commit mode the form is driven by the persisted pending queue and does not block new stories
+if PARTIAL_COMMIT_MODE:
+    persons_to_confirm = st.session_state.pending_edges.persons
+    show_confirmation = bool(persons_to_confirm)
+else:
+    persons_to_confirm = st.session_state.new_persons_buffer
+    show_confirmation = st.session_state.needs_confirmation and bool(persons_to_confirm)
+
+if show_confirmation:
     st.warning("Please confirm new people found in the story:")
     with st.form("confirmation_form"):
         confirmed_persons_list = []
-        for person in st.session_state.new_persons_buffer:
+        for person in persons_to_confirm:
             # Use checkbox for each person, default to True (add)
             add_person = st.checkbox(f"Add '{person.name}' (ID: {person.id}) to Rolodex?", value=True, key=f"confirm_{person.id}")
             if add_person:
@@ -96,19 +157,33 @@ if st.session_state.needs_confirmation and st.session_state.new_persons_buffer:
 
         submitted = st.form_submit_button("Confirm Selections")
         if submitted:
-            logging.info(f"User confirmed adding {len(confirmed_persons_list)} out of {len(st.session_state.new_persons_buffer)} new persons.")
+            logging.info(f"User confirmed adding {len(confirmed_persons_list)} out of {len(persons_to_confirm)} new persons.")
             # Merge confirmed data
-            if st.session_state.extracted_data_buffer:
-                updated_kg = merge_confirmed_data(
+            updated_kg, delta = None, None
+            if PARTIAL_COMMIT_MODE:
+                # Resolve the whole pending queue in one batch; edges to rejected persons are dropped
+                updated_kg, delta = resolve_pending_edges(
                     current_kg=st.session_state.knowledge_graph,
-                    confirmed_persons=confirmed_persons_list,
-                    extracted_events=st.session_state.extracted_data_buffer.events,
-                    extracted_relationships=st.session_state.extracted_data_buffer.relationships
+                    pending_edges=st.session_state.pending_edges,
+                    confirmed_persons=confirmed_persons_list
                 )
-
-                if updated_kg != st.session_state.knowledge_graph:
-                    st.session_state.knowledge_graph = updated_kg
-                    save_kg(st.session_state.knowledge_graph)
+            elif st.session_state.extracted_data_buffer:
+                # The speculative candidate already covers the common "confirm everyone" case, unless the graph changed since
+                speculative = st.session_state.speculative_buffer
+                if (speculative is not None and speculative.is_current_for(st.session_state.graph_revision, st.session_state.pending_edges.get_person_ids())
+                        and len(confirmed_persons_list) == len(st.session_state.new_persons_buffer)):
+                    updated_kg, delta = speculative.candidate_kg, speculative.candidate_delta
+                else:
+                    updated_kg, delta = merge_confirmed_data_with_delta(
+                        current_kg=st.session_state.knowledge_graph,
+                        confirmed_persons=confirmed_persons_list,
+                        extracted_events=st.session_state.extracted_data_buffer.events,
+                        extracted_relationships=st.session_state.extracted_data_buffer.relationships
+                    )
+
+            if updated_kg is not None:
+                if not delta.is_empty():
+                    commit_knowledge_graph(updated_kg, delta)
                     logging.info("Knowledge graph updated and saved after confirmation.")
                     st.sidebar.json(st.session_state.knowledge_graph.model_dump(), expanded=False) # Update sidebar
                     assistant_response = f"Okay, I've added the confirmed people and related information to the knowledge graph."
@@ -125,12 +200,19 @@ if st.session_state.needs_confirmation and st.session_state.new_persons_buffer:
                 if synthesized_audio:
                     st.audio(synthesized_audio, format="audio/wav")
 
+            # Clear the queue only after the graph is saved; resolving it twice is harmless
+            if PARTIAL_COMMIT_MODE:
+                st.session_state.pending_edges = PendingEdges()
+                save_pending_edges(st.session_state.pending_edges)
+
             # Reset confirmation state
             st.session_state.needs_confirmation = False
             st.session_state.extracted_data_buffer = None
+            st.session_state.speculative_buffer = None
             st.session_state.new_persons_buffer = []
-            st.session_state.processing = False # Ensure processing is false
-            st.session_state.uploaded_file_key += 1 # Increment key to reset uploader
+            if not PARTIAL_COMMIT_MODE: # The form doesn't block input in partial-commit mode, so keep any new upload/recording
+                st.session_state.processing = False # Ensure processing is false
+                st.session_state.uploaded_file_key += 1 # Increment key to reset uploader
             st.rerun()
 
 
@@ -165,6 +247,9 @@ process_recording_button = st.button(
     key="process_recording_btn"
 )
 
+# Start transcription/extraction in the background while the user decides which button to press
+prefetch_audio_story(recorded_audio_bytes, uploaded_file)
+
 
 # Trigger processing if either button is pressed
 if (process_upload_button and uploaded_file is not None) or \
@@ -188,6 +273,7 @@ if (process_upload_button and uploaded_file is not None) or \
         # Clear previous confirmation state if starting new processing
         st.session_state.needs_confirmation = False
         st.session_state.extracted_data_buffer = None
+        st.session_state.speculative_buffer = None
         st.session_state.new_persons_buffer = []
         st.session_state.current_file_processed = False # Reset processing flag for new input
         logging.info("Setting processing state to True and resetting confirmation/buffers.")
@@ -0,0 +1,127 @@
+"""
+Latency and quality comparison of transcription/extraction backends on a fixed corpus.
+
+    python -m benchmarks.compare_backends                      # extraction, every available backend
+    python -m benchmarks.compare_backends --backends rules     # just the offline rule-based extractor
+    python -m benchmarks.compare_backends --audio-dir stories/ # also transcription (name.wav + name.txt pairs)
+
+Extraction quality is scored against hand-labelled stories.jsonl: F1 on person ids, on person-person
+links (unordered, any type), and on which persons were linked to some event. Event ids are not scored
+because every backend names events differently. Transcription is scored by word error rate.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import date
+from typing import Dict, List, Set
+
+from src.models import KnowledgeGraph, normalize_id
+from src.services import DeepgramService, InstructorService, LocalWhisperService, RuleBasedExtractor
+from src.services.backend_router import build_local_llm_extractor
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "stories.jsonl")
+CORPUS_DATE = date(2026, 10, 19)  # Fixed "today" so relative dates in the corpus resolve the same way every run
+
+def f1(predicted: Set, expected: Set) -> float:
+    if not predicted and not expected:
+        return 1.0
+    true_positives = len(predicted & expected)
+    if not true_positives:
+        return 0.0
+    precision, recall = true_positives / len(predicted), true_positives / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+def score_extraction(kg: KnowledgeGraph, story: Dict) -> Dict[str, float]:
+    person_ids = {normalize_id(p.name) for p in kg.persons}
+    event_ids = {normalize_id(e.id) for e in kg.events}
+    links, attendees = set(), set()
+    for rel in kg.relationships:
+        source, target = normalize_id(rel.source), normalize_id(rel.target)
+        if source in person_ids and target in person_ids:
+            links.add(frozenset((source, target)))
+        elif source in person_ids and target in event_ids:
+            attendees.add(source)
+        elif target in person_ids and source in event_ids:
+            attendees.add(target)
+    return {
+        "persons": f1(person_ids, set(story["persons"])),
+        "links": f1(links, {frozenset(pair) for pair in story["links"]}),
+        "attendance": f1(attendees, set(story["attendees"])),
+    }
+
+def word_error_rate(hypothesis: str, reference: str) -> float:
+    hyp, ref = hypothesis.lower().split(), reference.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+def load_corpus() -> List[Dict]:
+    with open(CORPUS_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def extraction_backends(names: List[str]) -> list:
+    candidates = {"rules": lambda: RuleBasedExtractor(today=CORPUS_DATE), "openai": InstructorService, "local_llm": build_local_llm_extractor}
+    backends = []
+    for name in names:
+        backend = candidates[name]()
+        if backend is None or not backend.is_available():
+            print(f"Skipping {name}: not configured or not available.")
+            continue
+        backends.append(backend)
+    return backends
+
+async def compare_extraction(backends: list, corpus: List[Dict]):
+    print(f"\nExtraction on {len(corpus)} stories")
+    print(f"{'backend':<28}{'mean ms':>10}{'max ms':>10}{'persons':>10}{'links':>10}{'attend':>10}")
+    for backend in backends:
+        latencies, scores = [], []
+        for story in corpus:
+            start = time.perf_counter()
+            kg = await backend.extract_kg_data(story["text"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            scores.append(score_extraction(kg or KnowledgeGraph(), story))
+        means = {metric: statistics.mean(s[metric] for s in scores) for metric in scores[0]}
+        print(f"{backend.name:<28}{statistics.mean(latencies):>10.1f}{max(latencies):>10.1f}"
+              f"{means['persons']:>10.2f}{means['links']:>10.2f}{means['attendance']:>10.2f}")
+
+async def compare_transcription(audio_dir: str):
+    pairs = sorted(name[:-4] for name in os.listdir(audio_dir) if name.endswith(".wav") and os.path.exists(os.path.join(audio_dir, name[:-4] + ".txt")))
+    print(f"\nTranscription on {len(pairs)} recordings")
+    print(f"{'backend':<28}{'mean ms':>10}{'max ms':>10}{'WER':>10}")
+    for backend in (DeepgramService(), LocalWhisperService()):
+        if not backend.is_available():
+            print(f"Skipping {backend.name}: not available.")
+            continue
+        latencies, errors = [], []
+        for name in pairs:
+            with open(os.path.join(audio_dir, name + ".wav"), "rb") as f:
+                audio_data = f.read()
+            with open(os.path.join(audio_dir, name + ".txt")) as f:
+                reference = f.read()
+            start = time.perf_counter()
+            transcript = await backend.transcribe_audio(audio_data)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors.append(word_error_rate(transcript or "", reference))
+        print(f"{backend.name:<28}{statistics.mean(latencies):>10.1f}{max(latencies):>10.1f}{statistics.mean(errors):>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default="rules,local_llm,openai", help="Comma-separated: rules, local_llm, openai")
+    parser.add_argument("--audio-dir", help="Directory of name.wav recordings with name.txt reference transcripts.")
+    args = parser.parse_args()
+
+    backends = extraction_backends([name.strip() for name in args.backends.split(",") if name.strip()])
+    if backends:
+        asyncio.run(compare_extraction(backends, load_corpus()))
+    if args.audio_dir:
+        asyncio.run(compare_transcription(args.audio_dir))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Peak memory and time of a large export/import round trip through the streaming graph I/O.
+
+    python -m benchmarks.graph_io_roundtrip                  # 1M edges
+    python -m benchmarks.graph_io_roundtrip --edges 200000
+
+Each stage runs in its own process, so its peak RSS is measured on its own:
+generate a JSONL source, import it into a saved graph (as the CLI does), export the saved graph to
+Neo4j CSV, convert that to GraphML, import the GraphML into a second saved graph, and check both saved
+graphs hold the same records. Streaming stages should stay flat as --edges grows; imports hold the graph.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from src.graph_io import import_graph, write_records, convert_graph
+from src.persistence import load_kg, save_kg, iter_saved_kg
+
+STAGES = ["generate", "import_jsonl", "export_csv", "convert_graphml", "import_graphml", "verify"]
+INGESTED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+
+def generate(path: str, edges: int):
+    """Writes a JSONL graph with `edges` unique relationships, without building it in memory."""
+    persons, events = max(1, edges // 5), max(4, edges // 10)
+    with open(path, 'w') as f:
+        for i in range(persons):
+            f.write(json.dumps({"kind": "person", "id": f"person_{i}", "name": f"Person {i}"}) + "\n")
+        for i in range(events):
+            f.write(json.dumps({"kind": "event", "id": f"event_{i}", "description": f"Event {i}", "ingested_at": INGESTED_AT}) + "\n")
+        for i in range(edges):
+            source, k = i % persons, i // persons
+            if k < 2:
+                target, rel_type = f"person_{(source + k + 1) % persons}", "KNOWS"
+            else:
+                target, rel_type = f"event_{(source * 7 + k) % events}", "ATTENDED"
+            f.write(json.dumps({"kind": "relationship", "source": f"person_{source}", "target": target, "type": rel_type, "ingested_at": INGESTED_AT}) + "\n")
+
+def run_stage(stage: str, directory: str, edges: int):
+    paths = {name: os.path.join(directory, name) for name in ("source.jsonl", "graph.json", "neo4j", "graph.graphml", "reimported.json")}
+    if stage == "generate":
+        generate(paths["source.jsonl"], edges)
+    elif stage == "import_jsonl":
+        kg = load_kg(paths["graph.json"])
+        import_graph(paths["source.jsonl"], kg=kg, in_place=True)
+        save_kg(kg, paths["graph.json"])
+    elif stage == "export_csv":
+        write_records(iter_saved_kg(paths["graph.json"]), paths["neo4j"])
+    elif stage == "convert_graphml":
+        convert_graph(paths["neo4j"], paths["graph.graphml"])
+    elif stage == "import_graphml":
+        kg = load_kg(paths["reimported.json"])
+        import_graph(paths["graph.graphml"], kg=kg, in_place=True)
+        save_kg(kg, paths["reimported.json"])
+    elif stage == "verify":
+        count = 0
+        for original, reimported in zip(iter_saved_kg(paths["graph.json"]), iter_saved_kg(paths["reimported.json"]), strict=True):
+            if original != reimported:
+                raise SystemExit(f"Round trip changed record {count}: {original!r} != {reimported!r}")
+            count += 1
+        print(f"verified {count} records", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        import logging
+        logging.getLogger().setLevel(logging.WARNING)
+        start = time.perf_counter()
+        run_stage(args.stage, args.dir, args.edges)
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+        print(json.dumps({"seconds": time.perf_counter() - start, "peak_mb": peak_mb}))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.edges} edges")
+        print(f"{'stage':<18}{'seconds':>10}{'peak RSS MB':>14}")
+        for stage in STAGES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.graph_io_roundtrip", "--stage", stage, "--dir", directory, "--edges", str(args.edges)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{stage:<18}{result['seconds']:>10.1f}{result['peak_mb']:>14.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for the parallel merge engine on a synthetic bulk backfill.
+
+    python -m benchmarks.parallel_merge                    # 20k fragments, 1/2/4/8 workers
+    python -m benchmarks.parallel_merge --fragments 100000 --workers 1,4
+
+Each fragment looks like one story's raw extraction output (a dict, as it would be read back from disk).
+Speedup is relative to the 1-worker run of the same engine. The serial merge (identify_new_persons +
+GraphMerger, fragment by fragment) is only a correctness reference: identify_new_persons rescans the
+graph's person ids per fragment, so it is quadratic and its time says nothing about scaling. Every
+parallel run must produce a graph identical to it.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from src.models import KnowledgeGraph
+from src.kg_utils import GraphMerger, identify_new_persons
+from src.parallel_merge import ParallelMerger
+
+INGESTED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+FIRST_NAMES = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi", "Ivan", "Judy", "Mallory", "Niaj"]
+LAST_NAMES = ["Smith", "Jones", "García", "O'Brien", "Nguyen", "Kowalski", "Okafor", "Lindqvist"]
+
+def make_fragments(count: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    fragments = []
+    for i in range(count):
+        names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randrange(count // 4 + 1)}" for _ in range(rng.randint(2, 5))]
+        event_id = f"Event {rng.randrange(count // 2 + 1)} at The Place"
+        fragments.append({
+            "persons": [{"id": name.lower(), "name": name} for name in names],
+            "events": [{"id": event_id, "description": f"Story {i} happened here", "attendees": names[:2]}],
+            "relationships": [{"source": name, "target": event_id, "type": "attended", "context": f"story {i}"} for name in names]
+                             + [{"source": a, "target": b, "type": "knows"} for a, b in zip(names, names[1:])],
+        })
+    return fragments
+
+def serial_merge(kg: KnowledgeGraph, fragments: List[Dict]) -> KnowledgeGraph:
+    merger = GraphMerger(kg.model_copy(deep=True), log_items=False)
+    for data in fragments:
+        fragment = KnowledgeGraph.model_validate(data)
+        merger.merge(identify_new_persons(merger.kg, fragment.persons), fragment.events, fragment.relationships, ingested_at=INGESTED_AT)
+    return merger.kg
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fragments", type=int, default=20000)
+    parser.add_argument("--workers", default="1,2,4,8", help="Worker counts to run; 1 is always included as the baseline.")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    fragments = make_fragments(args.fragments)
+    start = time.perf_counter()
+    expected = serial_merge(KnowledgeGraph(), fragments)
+    serial_seconds = time.perf_counter() - start
+    print(f"{args.fragments} fragments -> {len(expected.persons)} persons, {len(expected.events)} events, {len(expected.relationships)} relationships")
+    print(f"serial reference merge: {serial_seconds:.2f}s (correctness check only, not a speed baseline)")
+    print(f"{'engine':<16}{'seconds':>10}{'speedup':>10}{'identical':>11}")
+    baseline_seconds = None
+    for workers in sorted({1} | {int(w) for w in args.workers.split(",")}):
+        start = time.perf_counter()
+        merged = ParallelMerger(workers=workers).merge(KnowledgeGraph(), fragments, ingested_at=INGESTED_AT)
+        seconds = time.perf_counter() - start
+        baseline_seconds = baseline_seconds or seconds
+        print(f"{f'{workers} worker(s)':<16}{seconds:>10.2f}{baseline_seconds / seconds:>10.2f}{str(merged == expected):>11}")
+
+if __name__ == "__main__":
+    main()
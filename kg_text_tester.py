@@ -3,6 +3,7 @@ import asyncio
 from src.models import KnowledgeGraph
 from src.kg_utils import identify_new_persons, merge_confirmed_data
 from src.services.instructor_service import InstructorService
+from src.services.backend_router import build_extractor
 
 st.set_page_config(layout="centered")
 st.title("🧪 KG Text Tester")
@@ -17,8 +18,8 @@ story = st.text_area(
 
 if st.button("Extract Knowledge Graph", disabled=not story):
     with st.spinner("Extracting knowledge graph..."):
-        instructor_service = InstructorService()
-        extracted_kg = asyncio.run(instructor_service.extract_kg_data(story))
+        extraction_service = build_extractor(InstructorService())
+        extracted_kg = asyncio.run(extraction_service.extract_kg_data(story))
         if not extracted_kg:
             st.error("No knowledge graph could be extracted.")
         else:
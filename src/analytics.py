@@ -0,0 +1,211 @@
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .models import KnowledgeGraph, MergeDelta
+
+# --- Graph Analytics (degree, PageRank, components, communities) ---
+# Relationships are treated as undirected edges between Person/Event nodes, so people who attended the
+# same event end up in the same circle. Degree and connected components are maintained incrementally
+# from merge deltas; the CSR matrix and every derived result are cached until the next delta.
+
+class GraphAnalytics:
+    def __init__(self, kg: Optional[KnowledgeGraph] = None):
+        self._reset()
+        if kg is not None:
+            self.rebuild(kg)
+
+    def _reset(self):
+        self._kg: Optional[KnowledgeGraph] = None  # Graph last synced
+        self._node_index: Dict[str, int] = {}
+        self._node_ids: List[str] = []
+        self._is_person: List[bool] = []
+        self._edge_src: List[int] = []
+        self._edge_dst: List[int] = []
+        self._degree = np.zeros(0, dtype=np.int64)
+        self._parent: List[int] = []  # Union-find forest for connected components
+        self._invalidate()
+
+    def _invalidate(self):
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._pagerank: Optional[Tuple[tuple, np.ndarray]] = None
+        self._communities: Optional[np.ndarray] = None
+        self._components: Optional[List[List[str]]] = None
+        self._bridges: Optional[List[str]] = None
+        self._most_connected: Dict[Tuple[int, bool], List[Tuple[str, int]]] = {}
+
+    # --- Keeping in sync with the graph ---
+
+    def sync(self, kg: KnowledgeGraph):
+        """Rebuilds from kg unless it is the graph last synced. Merges should go through advance instead."""
+        if kg is not self._kg:
+            self.rebuild(kg)
+
+    def advance(self, before: KnowledgeGraph, after: KnowledgeGraph, delta: Optional[MergeDelta]):
+        """
+        Moves from `before` to `after`, which the merge that produced `delta` made from it: in O(delta) when
+        `before` is the graph last synced. Without a delta (the graph was replaced) the next sync rebuilds.
+        """
+        if delta is not None and before is self._kg:
+            self.apply_delta(delta)
+            self._kg = after
+
+    def rebuild(self, kg: KnowledgeGraph):
+        self._reset()
+        self.apply_delta(MergeDelta(persons=kg.persons, events=kg.events, relationships=kg.relationships))
+        self._kg = kg
+        logging.info(f"Graph analytics rebuilt: {len(self._node_ids)} nodes, {len(self._edge_src)} edges.")
+
+    def apply_delta(self, delta: MergeDelta):
+        """Adds the nodes and edges of one merge. Degree and components update in O(delta)."""
+        if delta.is_empty():
+            return
+        for person in delta.persons:
+            self._node(person.id, is_person=True)
+        for event in delta.events:
+            self._node(event.id, is_person=False)
+
+        new_degree = np.zeros(len(self._node_ids) + 2 * len(delta.relationships), dtype=np.int64)
+        for rel in delta.relationships:
+            src = self._node(rel.source)
+            dst = self._node(rel.target)
+            self._edge_src.append(src)
+            self._edge_dst.append(dst)
+            new_degree[src] += 1
+            new_degree[dst] += 1
+            self._union(src, dst)
+
+        n = len(self._node_ids)
+        degree = np.zeros(n, dtype=np.int64)
+        degree[:len(self._degree)] = self._degree
+        self._degree = degree + new_degree[:n]
+        self._invalidate()  # New nodes change the matrix size too, not just new edges
+
+    def _node(self, node_id: str, is_person: Optional[bool] = None) -> int:
+        index = self._node_index.get(node_id)
+        if index is None:
+            index = len(self._node_ids)
+            self._node_index[node_id] = index
+            self._node_ids.append(node_id)
+            self._is_person.append(bool(is_person))
+            self._parent.append(index)
+        elif is_person:
+            self._is_person[index] = True
+        return index
+
+    def _find(self, index: int) -> int:
+        root = index
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[index] != root:  # Path compression
+            self._parent[index], index = root, self._parent[index]
+        return root
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # --- Sparse adjacency ---
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (indptr, indices) of the symmetric adjacency matrix in CSR form."""
+        if self._csr is None:
+            n = len(self._node_ids)
+            src = np.asarray(self._edge_src, dtype=np.int64)
+            dst = np.asarray(self._edge_dst, dtype=np.int64)
+            rows = np.concatenate([src, dst])
+            cols = np.concatenate([dst, src])
+            order = np.argsort(rows, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+            self._csr = (indptr, cols[order])
+        return self._csr
+
+    # --- Metrics ---
+
+    def degree(self) -> Dict[str, int]:
+        return {node_id: int(d) for node_id, d in zip(self._node_ids, self._degree)}
+
+    def most_connected(self, top_n: int = 5, persons_only: bool = True) -> List[Tuple[str, int]]:
+        key = (top_n, persons_only)
+        if key not in self._most_connected:
+            candidates = [i for i in range(len(self._node_ids)) if self._is_person[i] or not persons_only]
+            candidates.sort(key=lambda i: (-self._degree[i], self._node_ids[i]))
+            self._most_connected[key] = [(self._node_ids[i], int(self._degree[i])) for i in candidates[:top_n]]
+        return list(self._most_connected[key])
+
+    def pagerank(self, damping: float = 0.85, max_iter: int = 100, tol: float = 1e-8) -> Dict[str, float]:
+        params = (damping, max_iter, tol)
+        if self._pagerank is None or self._pagerank[0] != params:
+            self._pagerank = (params, self._compute_pagerank(damping, max_iter, tol))
+        return {node_id: float(score) for node_id, score in zip(self._node_ids, self._pagerank[1])}
+
+    def _compute_pagerank(self, damping: float, max_iter: int, tol: float) -> np.ndarray:
+        n = len(self._node_ids)
+        if n == 0:
+            return np.zeros(0)
+        indptr, indices = self.csr()
+        out_degree = np.diff(indptr).astype(np.float64)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        dangling = out_degree == 0
+        ranks = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            contrib = np.divide(ranks, out_degree, out=np.zeros(n), where=~dangling)
+            new_ranks = np.bincount(rows, weights=contrib[indices], minlength=n)
+            new_ranks = damping * (new_ranks + ranks[dangling].sum() / n) + (1.0 - damping) / n
+            converged = np.abs(new_ranks - ranks).sum() < tol
+            ranks = new_ranks
+            if converged:
+                break
+        return ranks
+
+    def connected_components(self) -> List[List[str]]:
+        """Groups of nodes reachable from each other, largest first."""
+        if self._components is None:
+            groups: Dict[int, List[str]] = {}
+            for index, node_id in enumerate(self._node_ids):
+                groups.setdefault(self._find(index), []).append(node_id)
+            self._components = sorted(groups.values(), key=lambda group: (-len(group), group[0]))
+        return [list(group) for group in self._components]
+
+    def communities(self, max_iter: int = 20) -> Dict[str, int]:
+        """Friend groups via deterministic label propagation (ties go to the smallest label)."""
+        if self._communities is None:
+            self._communities = self._compute_communities(max_iter)
+        return {node_id: int(label) for node_id, label in zip(self._node_ids, self._communities)}
+
+    def _compute_communities(self, max_iter: int) -> np.ndarray:
+        n = len(self._node_ids)
+        indptr, indices = self.csr()
+        labels = np.arange(n)
+        for _ in range(max_iter):
+            changed = False
+            for i in range(n):
+                neighbours = indices[indptr[i]:indptr[i + 1]]
+                if len(neighbours) == 0:
+                    continue
+                counts = Counter(labels[neighbours].tolist())
+                best_count = max(counts.values())
+                best_label = min(label for label, count in counts.items() if count == best_count)
+                if best_label != labels[i]:
+                    labels[i] = best_label
+                    changed = True
+            if not changed:
+                break
+        return labels
+
+    def bridges(self) -> List[str]:
+        """Persons whose connections span more than one community."""
+        if self._bridges is None:
+            self.communities()
+            labels = self._communities
+            indptr, indices = self.csr()
+            self._bridges = []
+            for i, node_id in enumerate(self._node_ids):
+                if not self._is_person[i]:
+                    continue
+                neighbour_labels = set(labels[indices[indptr[i]:indptr[i + 1]]].tolist())
+                if len(neighbour_labels) > 1:
+                    self._bridges.append(node_id)
+        return list(self._bridges)
@@ -16,15 +16,59 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # File paths for persistence (relative to project root)
 KG_FILE = "knowledge_graph.json"
 CHAT_HISTORY_FILE = "chat_history.json"
+PENDING_EDGES_FILE = "pending_edges.json"
+HISTORY_DIR = "kg_history"
+
+# Graph history: a full snapshot every N versions, deltas in between; older versions are compacted away
+HISTORY_SNAPSHOT_INTERVAL = int(os.getenv("HISTORY_SNAPSHOT_INTERVAL", "50"))
+HISTORY_RETAIN_VERSIONS = int(os.getenv("HISTORY_RETAIN_VERSIONS", "500"))
+
+# Bulk import: records merged per batch when streaming JSONL/CSV/GraphML into the graph
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "10000"))
+
+# Partial commit: merge data about known people immediately and queue only edges that involve new persons
+PARTIAL_COMMIT_MODE = os.getenv("PARTIAL_COMMIT_MODE", "true").lower() in ("1", "true", "yes")
+
+# Transcription/extraction backends (see src/services/backend_router.py)
+def _choice(name: str, default: str, choices: tuple) -> str:
+    value = os.getenv(name, default).lower()
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, not {value!r}.")
+    return value
+
+TRANSCRIPTION_BACKEND = _choice("TRANSCRIPTION_BACKEND", "remote", ("remote", "local", "auto"))
+EXTRACTION_BACKEND = _choice("EXTRACTION_BACKEND", "remote", ("remote", "local", "rules", "auto"))
+# In "remote" mode, use the local backends when the remote one fails (e.g. offline). Off by default:
+# the rule-based extractor finds far less than the remote LLM, so it has to be asked for.
+LOCAL_FALLBACK = os.getenv("LOCAL_FALLBACK", "false").lower() in ("1", "true", "yes")
+LOCAL_STT_MODEL = os.getenv("LOCAL_STT_MODEL", "base.en")  # faster-whisper model size, runs on CPU
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:11434/v1")  # Any OpenAI-compatible server, e.g. Ollama
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "")  # e.g. "llama3.1:8b"; empty means the rule-based extractor is the local path
+# In "auto" mode, inputs at or under these sizes go to the local backend first
+ROUTER_SHORT_STORY_WORDS = int(os.getenv("ROUTER_SHORT_STORY_WORDS", "60"))
+ROUTER_SHORT_AUDIO_SECONDS = float(os.getenv("ROUTER_SHORT_AUDIO_SECONDS", "20"))
+
+# Speculative pre-processing (transcribe/extract while the user is still deciding)
+ENABLE_SPECULATIVE_PROCESSING = os.getenv("ENABLE_SPECULATIVE_PROCESSING", "true").lower() in ("1", "true", "yes")
+SPECULATIVE_CACHE_SIZE = int(os.getenv("SPECULATIVE_CACHE_SIZE", "4"))
+# How long "Process" waits for an unfinished speculative job before processing the input directly
+SPECULATIVE_WAIT_SECONDS = float(os.getenv("SPECULATIVE_WAIT_SECONDS", "20"))
 
 # --- API Key Validation ---
 def validate_api_keys():
     """Checks if API keys are loaded correctly."""
     keys_valid = True
+    # Keys are only required for the remote backends that are actually in use
     if not DEEPGRAM_API_KEY or DEEPGRAM_API_KEY == "YOUR_DEEPGRAM_API_KEY":
-        logging.error("Deepgram API key missing or placeholder in .env file.")
-        keys_valid = False
+        if TRANSCRIPTION_BACKEND == "local":
+            logging.warning("Deepgram API key missing; transcribing locally and spoken responses are disabled.")
+        else:
+            logging.error("Deepgram API key missing or placeholder in .env file.")
+            keys_valid = False
     if not OPENAI_API_KEY or OPENAI_API_KEY == "YOUR_OPENAI_API_KEY":
-        logging.error("OpenAI API key missing or placeholder in .env file.")
-        keys_valid = False
+        if EXTRACTION_BACKEND in ("local", "rules"):
+            logging.warning("OpenAI API key missing; extracting locally.")
+        else:
+            logging.error("OpenAI API key missing or placeholder in .env file.")
+            keys_valid = False
     return keys_valid
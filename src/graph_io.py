@@ -0,0 +1,299 @@
+import argparse
+import csv
+import json
+import logging
+import os
+from typing import Dict, Iterable, Iterator, Optional, Union
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+from pydantic import ValidationError
+from .models import KnowledgeGraph, Person, Event, Relationship, normalize_id
+from .kg_utils import GraphMerger
+from .config import IMPORT_BATCH_SIZE, KG_FILE
+
+# --- Streaming Export/Import (JSONL, Neo4j CSV, GraphML) ---
+# Records are passed around as generators of Person/Event/Relationship, one at a time, so no format
+# is ever held in memory as a whole document. Imports are merged in batches with the same rules as
+# merge_confirmed_data. Every writer emits all nodes before any edge, so edges always find their nodes.
+# Memory: export (from the saved graph) and convert are constant. An import holds the target graph,
+# which dedup needs, plus one batch; the CLI merges in place and streams the saved file both ways.
+
+Record = Union[Person, Event, Relationship]
+
+_KINDS = {Person: "person", Event: "event", Relationship: "relationship"}
+_MODELS = {kind: model for model, kind in _KINDS.items()}
+
+def iter_records(kg: KnowledgeGraph) -> Iterator[Record]:
+    """Yields every node, then every edge, of the graph."""
+    yield from kg.persons
+    yield from kg.events
+    yield from kg.relationships
+
+# --- JSONL ---
+
+def write_jsonl(records: Iterable[Record], path: str) -> int:
+    count = 0
+    with open(path, 'w') as f:
+        for record in records:
+            data = {"kind": _KINDS[type(record)], **record.model_dump(mode='json', exclude_none=True)}
+            f.write(json.dumps(data) + "\n")
+            count += 1
+    logging.info(f"Exported {count} records to {path}")
+    return count
+
+def read_jsonl(path: str) -> Iterator[Record]:
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise TypeError(f"expected a JSON object, got {type(data).__name__}")
+                yield _MODELS[data.pop("kind")](**data)
+            except (json.JSONDecodeError, KeyError, TypeError, ValidationError) as e:
+                logging.warning(f"Skipping invalid record on line {line_number} of {path}: {e}")
+
+# --- Neo4j CSV (neo4j-admin database import) ---
+# persons.csv and events.csv share one ID space so relationships can point at either node type:
+#   neo4j-admin database import full --nodes=persons.csv --nodes=events.csv --relationships=relationships.csv
+
+NEO4J_PERSONS_FILE = "persons.csv"
+NEO4J_EVENTS_FILE = "events.csv"
+NEO4J_RELATIONSHIPS_FILE = "relationships.csv"
+NEO4J_ARRAY_DELIMITER = ";"
+
+_NEO4J_HEADERS = {
+    Person: ["id:ID", "name", ":LABEL"],
+    Event: ["id:ID", "description", "attendees:string[]", "occurred_at:date", "ingested_at:datetime", ":LABEL"],
+    Relationship: [":START_ID", ":END_ID", ":TYPE", "context", "ingested_at:datetime"],
+}
+_NEO4J_FILES = {Person: NEO4J_PERSONS_FILE, Event: NEO4J_EVENTS_FILE, Relationship: NEO4J_RELATIONSHIPS_FILE}
+
+def _neo4j_row(record: Record) -> list:
+    data = record.model_dump(mode='json')
+    if isinstance(record, Person):
+        return [data["id"], data["name"], "Person"]
+    if isinstance(record, Event):
+        attendees = NEO4J_ARRAY_DELIMITER.join(data.get("attendees") or [])
+        return [data["id"], data["description"], attendees, data.get("occurred_at") or "", data.get("ingested_at") or "", "Event"]
+    return [data["source"], data["target"], data["type"], data.get("context") or "", data.get("ingested_at") or ""]
+
+def write_neo4j_csv(records: Iterable[Record], directory: str) -> Dict[str, int]:
+    os.makedirs(directory, exist_ok=True)
+    files, writers, counts = {}, {}, {}
+    try:
+        for model, filename in _NEO4J_FILES.items():
+            files[model] = open(os.path.join(directory, filename), 'w', newline='')
+            writers[model] = csv.writer(files[model])
+            writers[model].writerow(_NEO4J_HEADERS[model])
+            counts[filename] = 0
+        for record in records:
+            writers[type(record)].writerow(_neo4j_row(record))
+            counts[_NEO4J_FILES[type(record)]] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    logging.info(f"Exported Neo4j CSV files to {directory}: {counts}")
+    return counts
+
+def _neo4j_field(column: str) -> str:
+    """Maps a neo4j-admin header ('id:ID', ':START_ID', 'occurred_at:date') to a model field name."""
+    special = {":START_ID": "source", ":END_ID": "target", ":TYPE": "type", ":LABEL": None}
+    if column in special:
+        return special[column]
+    name = column.split(":", 1)[0]
+    return name or None
+
+def _read_neo4j_file(path: str, model) -> Iterator[Record]:
+    if not os.path.exists(path):
+        logging.warning(f"{path} not found, skipping.")
+        return
+    with open(path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        fields = [_neo4j_field(column) for column in header]
+        for line_number, row in enumerate(reader, start=2):
+            data = {field: value for field, value in zip(fields, row) if field and value != ""}
+            if "attendees" in data:
+                data["attendees"] = data["attendees"].split(NEO4J_ARRAY_DELIMITER)
+            try:
+                yield model(**data)
+            except ValidationError as e:
+                logging.warning(f"Skipping invalid row {line_number} of {path}: {e}")
+
+def read_neo4j_csv(directory: str) -> Iterator[Record]:
+    for model, filename in _NEO4J_FILES.items():
+        yield from _read_neo4j_file(os.path.join(directory, filename), model)
+
+# --- GraphML ---
+
+GRAPHML_NS = "http://graphml.graphdrawing.org/xmlns"
+_GRAPHML_KEYS = [
+    ("kind", "node"), ("name", "node"), ("description", "node"), ("attendees", "node"),
+    ("occurred_at", "node"), ("ingested_at", "all"), ("type", "edge"), ("context", "edge"),
+]
+
+def write_graphml(records: Iterable[Record], path: str) -> int:
+    count = 0
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<graphml xmlns="{GRAPHML_NS}">\n')
+        for key, domain in _GRAPHML_KEYS:
+            f.write(f'  <key id="{key}" for="{domain}" attr.name="{key}" attr.type="string"/>\n')
+        f.write('  <graph id="rolodex" edgedefault="directed">\n')
+        for record in records:
+            data = record.model_dump(mode='json', exclude_none=True)
+            if isinstance(record, Relationship):
+                f.write(f'    <edge source={quoteattr(data.pop("source"))} target={quoteattr(data.pop("target"))}>')
+            else:
+                f.write(f'    <node id={quoteattr(data.pop("id"))}><data key="kind">{_KINDS[type(record)]}</data>')
+            if "attendees" in data:
+                data["attendees"] = NEO4J_ARRAY_DELIMITER.join(data["attendees"])
+            for key, value in data.items():
+                if value != "":
+                    f.write(f'<data key="{key}">{escape(str(value))}</data>')
+            f.write('</edge>\n' if isinstance(record, Relationship) else '</node>\n')
+            count += 1
+        f.write('  </graph>\n</graphml>\n')
+    logging.info(f"Exported {count} records to {path}")
+    return count
+
+def _graphml_record(tag: str, attrib: dict, data: dict) -> Record:
+    if "attendees" in data:
+        data["attendees"] = [a for a in data["attendees"].split(NEO4J_ARRAY_DELIMITER) if a]
+    if tag == "edge":
+        return Relationship(source=attrib["source"], target=attrib["target"], **data)
+    # Files from other tools may carry Neo4j-style labels instead of our 'kind' key
+    kind = (data.pop("kind", None) or data.pop("labels", "")).strip(":").lower()
+    if kind == "person" or (not kind and "name" in data):
+        return Person(id=attrib["id"], name=data.get("name", attrib["id"]))
+    return Event(id=attrib["id"], **{k: v for k, v in data.items() if k in Event.model_fields})
+
+def read_graphml(path: str) -> Iterator[Record]:
+    key_names: Dict[str, str] = {}
+    graph_element = None
+    for event, element in iterparse(path, events=("start", "end")):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == "graph":
+                graph_element = element
+            continue
+        if tag == "key":
+            key_names[element.get("id")] = element.get("attr.name", element.get("id"))
+        elif tag in ("node", "edge"):
+            data = {}
+            for child in element:
+                if child.tag.rsplit("}", 1)[-1] == "data" and child.text is not None:
+                    data[key_names.get(child.get("key"), child.get("key"))] = child.text
+            try:
+                yield _graphml_record(tag, dict(element.attrib), data)
+            except (KeyError, ValidationError) as e:
+                logging.warning(f"Skipping invalid GraphML {tag} {dict(element.attrib)}: {e}")
+            # Drop parsed elements so memory stays flat regardless of file size
+            element.clear()
+            if graph_element is not None:
+                graph_element.clear()
+
+# --- Batch Import ---
+
+def import_records(records: Iterable[Record], kg: Optional[KnowledgeGraph] = None, batch_size: int = IMPORT_BATCH_SIZE,
+                   in_place: bool = False) -> KnowledgeGraph:
+    """
+    Merges a stream of records into a copy of kg (or a new graph), batch_size records at a time.
+    With in_place=True, kg itself is merged into instead, so the graph is never held twice.
+    Imported persons count as confirmed; events and relationships follow merge_confirmed_data rules.
+    """
+    if kg is None:
+        target = KnowledgeGraph()
+    else:
+        target = kg if in_place else kg.model_copy(deep=True)
+    merger = GraphMerger(target, log_items=False)
+    persons, events, relationships = [], [], []
+    total = 0
+
+    def flush():
+        delta = merger.merge(persons, events, relationships)
+        logging.info(f"Imported batch: +{len(delta.persons)} persons, +{len(delta.events)} events, +{len(delta.relationships)} relationships ({total} records read).")
+        persons.clear()
+        events.clear()
+        relationships.clear()
+
+    for record in records:
+        if isinstance(record, Person):
+            person_id = normalize_id(record.id or record.name)
+            persons.append(record if record.id == person_id else Person(id=person_id, name=record.name))
+        elif isinstance(record, Event):
+            events.append(record)
+        else:
+            relationships.append(record)
+        total += 1
+        if len(persons) + len(events) + len(relationships) >= batch_size:
+            flush()
+    if persons or events or relationships:
+        flush()
+    return target
+
+# --- Format dispatch ---
+
+FORMATS = ("jsonl", "csv", "graphml")
+
+def detect_format(path: str) -> str:
+    """'.jsonl' and '.graphml' files map to their format; a directory (or anything else) is Neo4j CSV."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in ("jsonl", "graphml") else "csv"
+
+def write_records(records: Iterable[Record], path: str, fmt: Optional[str] = None):
+    fmt = fmt or detect_format(path)
+    if fmt == "jsonl":
+        return write_jsonl(records, path)
+    if fmt == "graphml":
+        return write_graphml(records, path)
+    return write_neo4j_csv(records, path)
+
+def export_graph(kg: KnowledgeGraph, path: str, fmt: Optional[str] = None):
+    return write_records(iter_records(kg), path, fmt)
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Record]:
+    fmt = fmt or detect_format(path)
+    if fmt == "jsonl":
+        return read_jsonl(path)
+    if fmt == "graphml":
+        return read_graphml(path)
+    return read_neo4j_csv(path)
+
+def import_graph(path: str, kg: Optional[KnowledgeGraph] = None, fmt: Optional[str] = None, batch_size: int = IMPORT_BATCH_SIZE,
+                 in_place: bool = False) -> KnowledgeGraph:
+    return import_records(read_records(path, fmt), kg=kg, batch_size=batch_size, in_place=in_place)
+
+def convert_graph(source_path: str, target_path: str, source_fmt: Optional[str] = None, target_fmt: Optional[str] = None):
+    """Streams records from one format to another without building a graph (no dedup or validation of edges)."""
+    return write_records(read_records(source_path, source_fmt), target_path, target_fmt)
+
+def main():
+    from .persistence import load_kg, save_kg, iter_saved_kg
+
+    parser = argparse.ArgumentParser(description="Move a rolodex in or out of JSONL, Neo4j CSV or GraphML.")
+    parser.add_argument("command", choices=["export", "import", "convert"])
+    parser.add_argument("path", help="A .jsonl or .graphml file, or a directory of Neo4j CSV files.")
+    parser.add_argument("target", nargs="?", help="Output path for 'convert'.")
+    parser.add_argument("--format", choices=FORMATS, help="Override the format detected from the path.")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--graph", default=KG_FILE, help="The saved knowledge graph to export from or import into.")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        write_records(iter_saved_kg(args.graph), args.path, args.format)  # Straight from the file, never loading the graph
+    elif args.command == "convert":
+        if not args.target:
+            parser.error("convert needs a target path")
+        convert_graph(args.path, args.target, source_fmt=args.format)
+    else:
+        kg = load_kg(args.graph)
+        import_graph(args.path, kg=kg, fmt=args.format, batch_size=args.batch_size, in_place=True)
+        save_kg(kg, args.graph)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+from .models import KnowledgeGraph, MergeDelta
+from .kg_utils import replay_delta, revert_delta
+from .config import HISTORY_DIR, HISTORY_SNAPSHOT_INTERVAL, HISTORY_RETAIN_VERSIONS
+
+# --- Versioned Graph History ---
+# Every merge is appended to deltas.jsonl as the MergeDelta it produced; every HISTORY_SNAPSHOT_INTERVAL
+# versions (and whenever the graph is replaced wholesale, e.g. cleared or restored) a full snapshot is written.
+# Undoing a merge drops its delta from the tail of the graph; checking out an old version loads the nearest
+# snapshot at or before it and replays the deltas after it. Compaction drops snapshots and deltas older
+# than HISTORY_RETAIN_VERSIONS so disk usage stays bounded.
+
+DELTA_LOG_FILE = "deltas.jsonl"
+_SNAPSHOT_PATTERN = re.compile(r"^snapshot_(\d+)\.json$")
+
+class HistoryEntry(BaseModel):
+    version: int
+    kind: str = Field(..., description="'merge' (delta recorded) or 'snapshot' (graph replaced wholesale).")
+    timestamp: datetime
+    counts: Tuple[int, int, int] = Field(..., description="(persons, events, relationships) after this version.")
+    digest: Optional[str] = Field(None, description="Content hash of the graph after this version, when a snapshot was written for it.")
+    delta: Optional[MergeDelta] = None
+
+class GraphDiff(BaseModel):
+    """What changed going from one version to another."""
+    added: MergeDelta = Field(default_factory=MergeDelta)
+    removed: MergeDelta = Field(default_factory=MergeDelta)
+
+def graph_digest(kg: KnowledgeGraph) -> str:
+    """SHA-256 of the graph's content. The time index is derived from it, so it is left out."""
+    return hashlib.sha256(kg.model_dump_json(exclude={"time_index"}).encode()).hexdigest()
+
+def _concat(deltas: List[MergeDelta]) -> MergeDelta:
+    return MergeDelta(
+        persons=[p for d in deltas for p in d.persons],
+        events=[e for d in deltas for e in d.events],
+        relationships=[r for d in deltas for r in d.relationships],
+    )
+
+def _graph_diff(old_kg: KnowledgeGraph, new_kg: KnowledgeGraph) -> GraphDiff:
+    """Full comparison by key, for ranges that include a wholesale replacement."""
+    def keyed(kg):
+        return ({p.id: p for p in kg.persons}, {e.id: e for e in kg.events}, {(r.source, r.target, r.type): r for r in kg.relationships})
+    old_sections, new_sections = keyed(old_kg), keyed(new_kg)
+    added = [[item for key, item in new.items() if key not in old] for old, new in zip(old_sections, new_sections)]
+    removed = [[item for key, item in old.items() if key not in new] for old, new in zip(old_sections, new_sections)]
+    return GraphDiff(
+        added=MergeDelta(persons=added[0], events=added[1], relationships=added[2]),
+        removed=MergeDelta(persons=removed[0], events=removed[1], relationships=removed[2]),
+    )
+
+class GraphHistory:
+    def __init__(self, directory: str = HISTORY_DIR, snapshot_interval: int = HISTORY_SNAPSHOT_INTERVAL,
+                 retain_versions: int = HISTORY_RETAIN_VERSIONS):
+        self.directory = directory
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.retain_versions = max(1, retain_versions)
+        self.log_path = os.path.join(directory, DELTA_LOG_FILE)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()  # Shared by every session of the app (see get_graph_history)
+        self._offsets: List[Tuple[int, int]] = []  # (version, byte offset in the log), oldest first
+        self._head: Optional[HistoryEntry] = None  # Latest entry, without its delta
+        self._load_index()
+
+    # --- Index ---
+
+    def _load_index(self):
+        self._offsets = []
+        self._head = None
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb') as f:
+            offset = 0
+            last_line = None
+            for line in f:
+                if line.strip():
+                    self._offsets.append((json.loads(line)["version"], offset))
+                    last_line = line
+                offset += len(line)
+        if last_line is not None:
+            self._head = HistoryEntry(**json.loads(last_line)).model_copy(update={"delta": None})
+
+    def _snapshot_versions(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(_SNAPSHOT_PATTERN.match, os.listdir(self.directory)) if m)
+
+    def _snapshot_path(self, version: int) -> str:
+        return os.path.join(self.directory, f"snapshot_{version:08d}.json")
+
+    @property
+    def base_version(self) -> int:
+        """Oldest version that can still be checked out."""
+        if self._offsets:
+            return self._offsets[0][0] - 1
+        snapshots = self._snapshot_versions()
+        return snapshots[-1] if snapshots else 0
+
+    @property
+    def head_version(self) -> int:
+        return self._offsets[-1][0] if self._offsets else self.base_version
+
+    def _read_entries(self, first_version: int, last_version: int) -> List[HistoryEntry]:
+        """Entries first_version..last_version (inclusive), read sequentially from the first one's offset."""
+        positions = {version: offset for version, offset in self._offsets}
+        if first_version > last_version or first_version not in positions:
+            return []
+        entries = []
+        with open(self.log_path, 'r') as f:
+            f.seek(positions[first_version])
+            for line in f:
+                entry = HistoryEntry(**json.loads(line))
+                if entry.version > last_version:
+                    break
+                entries.append(entry)
+        return entries
+
+    def entries(self, limit: int = 20) -> List[HistoryEntry]:
+        """The most recent entries, newest first."""
+        with self._lock:
+            if not self._offsets:
+                return []
+            first = self._offsets[max(0, len(self._offsets) - limit)][0]
+            return list(reversed(self._read_entries(first, self.head_version)))
+
+    # --- Recording ---
+
+    def _append(self, entry: HistoryEntry):
+        with open(self.log_path, 'a') as f:
+            offset = f.tell()
+            f.write(entry.model_dump_json(exclude_none=True) + "\n")
+        self._offsets.append((entry.version, offset))
+        self._head = entry.model_copy(update={"delta": None})
+
+    def _write_snapshot(self, version: int, kg: KnowledgeGraph):
+        path = self._snapshot_path(version)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(kg.model_dump(mode='json'), f)
+        os.replace(f"{path}.tmp", path)
+        logging.info(f"Wrote graph snapshot for version {version}.")
+
+    def record_merge(self, kg: KnowledgeGraph, delta: MergeDelta) -> int:
+        """Records a merge that produced kg. Returns the new version."""
+        with self._lock:
+            version = self.head_version + 1
+            snapshot = version % self.snapshot_interval == 0
+            self._append(HistoryEntry(version=version, kind="merge", timestamp=datetime.now(timezone.utc), counts=kg.counts(),
+                                      digest=graph_digest(kg) if snapshot else None, delta=delta))
+            if snapshot:
+                self._write_snapshot(version, kg)
+                self.compact()
+            return version
+
+    def record_snapshot(self, kg: KnowledgeGraph) -> int:
+        """Records a wholesale replacement of the graph (clear, restore, external edit). Returns the new version."""
+        with self._lock:
+            version = self.head_version + 1
+            self._write_snapshot(version, kg)
+            self._append(HistoryEntry(version=version, kind="snapshot", timestamp=datetime.now(timezone.utc), counts=kg.counts(), digest=graph_digest(kg)))
+            self.compact()
+            return version
+
+    def ensure_head(self, kg: KnowledgeGraph):
+        """Records kg as a new version if its content doesn't match the head (first run, or the JSON was edited by hand)."""
+        with self._lock:
+            if self._head is not None and self._head.digest is not None:
+                differs = self._head.digest != graph_digest(kg)
+            else:  # Merge entries carry no digest: rebuild the head version to compare against
+                differs = graph_digest(kg) != graph_digest(self.checkout(self.head_version) if self.head_version else KnowledgeGraph())
+            if differs:
+                logging.info("Knowledge graph differs from history head, recording a snapshot.")
+                self.record_snapshot(kg)
+
+    # --- Undo / Checkout / Diff ---
+
+    def undo(self, kg: KnowledgeGraph, steps: int = 1) -> KnowledgeGraph:
+        """
+        Rolls kg (the head version) back by `steps` versions and forgets them. Merges are reverted on kg in place,
+        in O(delta); undoing a snapshot, or a merge kg no longer ends with, checks out the previous version instead.
+        Returns the resulting graph.
+        """
+        with self._lock:
+            if steps > self.head_version - self.base_version:
+                raise ValueError(f"Can only undo {self.head_version - self.base_version} version(s).")
+            for entry in reversed(self._read_entries(self.head_version - steps + 1, self.head_version)):
+                if not (entry.kind == "merge" and entry.delta is not None and revert_delta(kg, entry.delta)):
+                    kg = self.checkout(entry.version - 1)
+                self._truncate_after(entry.version - 1)
+                logging.info(f"Undid version {entry.version} ({entry.kind}).")
+            return kg
+
+    def _truncate_after(self, version: int):
+        positions = [offset for v, offset in self._offsets if v > version]
+        if positions:
+            with open(self.log_path, 'r+') as f:
+                f.truncate(positions[0])
+        self._offsets = [(v, offset) for v, offset in self._offsets if v <= version]
+        for snapshot_version in self._snapshot_versions():
+            if snapshot_version > version:
+                os.remove(self._snapshot_path(snapshot_version))
+        self._head = None
+        if self._offsets:
+            self._head = self._read_entries(self._offsets[-1][0], self._offsets[-1][0])[0].model_copy(update={"delta": None})
+
+    def checkout(self, version: int) -> KnowledgeGraph:
+        """The graph as it was at `version`: nearest snapshot at or before it, plus the deltas after it."""
+        with self._lock:
+            if not self.base_version <= version <= self.head_version:
+                raise ValueError(f"Version {version} is outside the retained history ({self.base_version}-{self.head_version}).")
+            snapshots = [v for v in self._snapshot_versions() if v <= version]
+            if snapshots:
+                with open(self._snapshot_path(snapshots[-1]), 'r') as f:
+                    kg = KnowledgeGraph(**json.load(f))
+                start = snapshots[-1]
+            else:
+                kg, start = KnowledgeGraph(), 0
+            for entry in self._read_entries(start + 1, version):
+                if entry.delta is not None:
+                    replay_delta(kg, entry.delta)
+            return kg
+
+    def diff(self, from_version: int, to_version: int) -> GraphDiff:
+        """Changes going from from_version to to_version (either direction)."""
+        with self._lock:
+            lo, hi = sorted((from_version, to_version))
+            entries = self._read_entries(lo + 1, hi)
+            if len(entries) != hi - lo or any(entry.kind != "merge" for entry in entries):
+                return _graph_diff(self.checkout(from_version), self.checkout(to_version))
+            combined = _concat([entry.delta for entry in entries if entry.delta is not None])
+            return GraphDiff(added=combined) if from_version <= to_version else GraphDiff(removed=combined)
+
+    # --- Compaction ---
+
+    def compact(self):
+        """Drops snapshots and deltas that are only needed for versions older than the retention window."""
+        with self._lock:
+            cutoff = self.head_version - self.retain_versions
+            candidates = [v for v in self._snapshot_versions() if v <= cutoff]
+            if not candidates or candidates[-1] <= self.base_version:
+                return
+            new_base = candidates[-1]
+            for snapshot_version in self._snapshot_versions():
+                if snapshot_version < new_base:
+                    os.remove(self._snapshot_path(snapshot_version))
+            keep_from = [offset for v, offset in self._offsets if v > new_base]
+            tmp_path = f"{self.log_path}.tmp"
+            with open(self.log_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                if keep_from:
+                    src.seek(keep_from[0])
+                    while chunk := src.read(1 << 20):
+                        dst.write(chunk)
+            os.replace(tmp_path, self.log_path)
+            self._load_index()
+            logging.info(f"Compacted graph history; oldest retained version is now {new_base}.")
@@ -1,6 +1,7 @@
 import logging
-from typing import List
-from .models import KnowledgeGraph, Person, Event, Relationship, normalize_id
+from datetime import datetime, timezone
+from typing import List, Optional, Set, Tuple
+from .models import GraphLookup, KnowledgeGraph, MergeDelta, PendingEdges, Person, Event, Relationship, TimeIndex, normalize_id
 
 def identify_new_persons(current_kg: KnowledgeGraph, extracted_persons: List[Person]) -> List[Person]:
     """Identifies persons from the extracted list that are not in the current KG."""
@@ -17,66 +18,220 @@ def identify_new_persons(current_kg: KnowledgeGraph, extracted_persons: List[Per
         logging.info(f"Identified {len(new_persons)} potential new persons: {[p.name for p in new_persons]}")
     return new_persons
 
-def merge_confirmed_data(current_kg: KnowledgeGraph, confirmed_persons: List[Person], extracted_events: List[Event], extracted_relationships: List[Relationship]) -> KnowledgeGraph:
-    """Merges confirmed persons, all extracted events, and related relationships into the current KG."""
+class GraphMerger:
+    """
+    Applies the merge rules to a graph in place. The id lookups are kept between calls, so many batches
+    (e.g. a bulk import) can be merged without copying or re-scanning the graph each time.
+    """
+    def __init__(self, kg: KnowledgeGraph, log_items: bool = True):
+        self.kg = kg
+        self.log_items = log_items # Per-item logging is too noisy (and slow) for bulk imports
+        self.person_ids = kg.get_person_ids()
+        self.event_ids = kg.get_event_ids()
+        self.relationship_tuples = kg.get_relationship_tuples()
+
+    def merge(self, confirmed_persons: List[Person], extracted_events: List[Event], extracted_relationships: List[Relationship], ingested_at: Optional[datetime] = None) -> MergeDelta:
+        """Merges confirmed persons, all extracted events, and related relationships. Returns what was added."""
+        delta = MergeDelta()
+        ingested_at = ingested_at or datetime.now(timezone.utc)
+        counts_before = self.kg.counts()
+
+        # Add confirmed new persons
+        for person in confirmed_persons:
+            # ID should already be normalized from identify_new_persons
+            if person.id and person.id not in self.person_ids:
+                self.kg.persons.append(person)
+                self.person_ids.add(person.id) # Track added persons for relationship check
+                delta.persons.append(person)
+                if self.log_items:
+                    logging.info(f"Adding confirmed new person: {person.name} (ID: {person.id})")
+
+        # Add new events (no confirmation needed for events in this version)
+        for event in extracted_events:
+            # Attempt to normalize ID from description if needed, or ensure it exists
+            event_id = normalize_id(event.id if event.id else event.description[:30])
+
+            if event_id and event_id not in self.event_ids:
+                # Recreate event with normalized ID and attendees if present; keep timestamps from imports
+                attendees = getattr(event, 'attendees', [])
+                new_event = Event(id=event_id, description=event.description, attendees=attendees, occurred_at=event.occurred_at, ingested_at=event.ingested_at or ingested_at)
+                self.kg.events.append(new_event)
+                self.event_ids.add(event_id)
+                delta.events.append(new_event)
+                if self.log_items:
+                    logging.info(f"Adding new event: {event.description[:30]}... (ID: {event_id})")
+        self.kg.time_index.add_events(delta.events)
+
+        # Add new relationships (ensuring nodes exist and relationship is new)
+        # Nodes can be existing ones OR newly confirmed persons OR newly added events
+        for rel in extracted_relationships:
+            source_id = normalize_id(rel.source) # Normalize IDs just in case
+            target_id = normalize_id(rel.target)
+            rel_type = rel.type.upper() # Standardize relationship type case
+
+            # Check if source and target nodes exist in the updated graph
+            source_exists = source_id in self.person_ids or source_id in self.event_ids
+            target_exists = target_id in self.person_ids or target_id in self.event_ids
+
+            if not source_exists:
+                logging.warning(f"Skipping relationship: Source node '{source_id}' not found in KG.")
+                continue
+            if not target_exists:
+                logging.warning(f"Skipping relationship: Target node '{target_id}' not found in KG.")
+                continue
+
+            rel_tuple = (source_id, target_id, rel_type)
+            if rel_tuple not in self.relationship_tuples:
+                 # Recreate relationship with normalized IDs and type
+                new_rel = Relationship(source=source_id, target=target_id, type=rel_type, context=rel.context, ingested_at=rel.ingested_at or ingested_at)
+                self.kg.relationships.append(new_rel)
+                self.relationship_tuples.add(rel_tuple)
+                delta.relationships.append(new_rel)
+                if self.log_items:
+                    logging.info(f"Adding new relationship: {source_id} -[{rel_type}]-> {target_id}")
+        self.kg.time_index.add_relationships(delta.relationships)
+
+        if not delta.is_empty():
+            self.kg.index_appended(counts_before)
+        return delta
+
+def merge_confirmed_data_with_delta(current_kg: KnowledgeGraph, confirmed_persons: List[Person], extracted_events: List[Event], extracted_relationships: List[Relationship]) -> Tuple[KnowledgeGraph, MergeDelta]:
+    """Like merge_confirmed_data, but also returns what the merge added, for history and analytics to apply in O(delta)."""
     updated_kg = current_kg.model_copy(deep=True)
+    delta = GraphMerger(updated_kg).merge(confirmed_persons, extracted_events, extracted_relationships)
+    return updated_kg, delta
 
-    current_person_ids = updated_kg.get_person_ids()
-    current_event_ids = updated_kg.get_event_ids()
-    current_relationships = updated_kg.get_relationship_tuples()
-
-    # Add confirmed new persons
-    confirmed_person_ids = set()
-    for person in confirmed_persons:
-        # ID should already be normalized from identify_new_persons
-        if person.id and person.id not in current_person_ids:
-            updated_kg.persons.append(person)
-            current_person_ids.add(person.id)
-            confirmed_person_ids.add(person.id) # Track added persons for relationship check
-            logging.info(f"Adding confirmed new person: {person.name} (ID: {person.id})")
-
-    # Add new events (no confirmation needed for events in this version)
-    event_ids_added_this_run = set()
-    for event in extracted_events:
-        # Attempt to normalize ID from description if needed, or ensure it exists
-        event_id = normalize_id(event.id if event.id else event.description[:30])
+def merge_confirmed_data(current_kg: KnowledgeGraph, confirmed_persons: List[Person], extracted_events: List[Event], extracted_relationships: List[Relationship]) -> KnowledgeGraph:
+    """Merges confirmed persons, all extracted events, and related relationships into a copy of the current KG."""
+    return merge_confirmed_data_with_delta(current_kg, confirmed_persons, extracted_events, extracted_relationships)[0]
+
+def replay_delta(kg: KnowledgeGraph, delta: MergeDelta):
+    """Appends an already-merged delta to kg in place, exactly as recorded (no normalization or dedup)."""
+    if delta.is_empty():
+        return
+    counts_before = kg.counts()
+    kg.persons.extend(delta.persons)
+    kg.events.extend(delta.events)
+    kg.relationships.extend(delta.relationships)
+    kg.time_index.add_events(delta.events)
+    kg.time_index.add_relationships(delta.relationships)
+    kg.index_appended(counts_before)
 
-        if event_id and event_id not in current_event_ids and event_id not in event_ids_added_this_run:
-            # Recreate event with normalized ID and attendees if present
-            attendees = getattr(event, 'attendees', [])
-            updated_kg.events.append(Event(id=event_id, description=event.description, attendees=attendees))
-            current_event_ids.add(event_id)
-            event_ids_added_this_run.add(event_id)
-            logging.info(f"Adding new event: {event.description[:30]}... (ID: {event_id})")
+def revert_delta(kg: KnowledgeGraph, delta: MergeDelta) -> bool:
+    """
+    Undoes a merge in place by cutting the items delta appended off the tails of kg's lists. Returns False,
+    leaving kg untouched, if they are not at the tail. O(delta), except that removing an event dated in the
+    past from the time index shifts the newer entries after it.
+    """
+    sections = ("persons", "events", "relationships")
+    for section in sections:
+        items, removed = getattr(kg, section), getattr(delta, section)
+        if len(removed) > len(items) or (removed and items[len(items) - len(removed):] != removed):
+            return False
+    counts_before = kg.counts()
+    for section in sections:
+        removed = getattr(delta, section)
+        if removed:
+            del getattr(kg, section)[-len(removed):]
+    kg.time_index.remove_events(delta.events)
+    kg.time_index.remove_relationships(delta.relationships)
+    kg.index_truncated(counts_before, delta)
+    return True
 
-    # Add new relationships (ensuring nodes exist and relationship is new)
-    # Nodes can be existing ones OR newly confirmed persons OR newly added events
-    all_person_ids = current_kg.get_person_ids().union(confirmed_person_ids)
-    all_event_ids = current_kg.get_event_ids().union(event_ids_added_this_run) # Use updated event IDs
+# --- Time-windowed Queries ---
 
-    rels_added_this_run = set()
+def rebuild_time_index(kg: KnowledgeGraph) -> TimeIndex:
+    """Builds the time index from scratch, e.g. for graphs saved before it existed."""
+    time_index = TimeIndex()
+    for event in kg.events:
+        time_index.add_event(event)
+    for rel in kg.relationships:
+        time_index.add_relationship(rel)
+    return time_index
+
+def _checked_lookup(kg: KnowledgeGraph, section: str, keys, key_of) -> GraphLookup:
+    """kg's lookup, rebuilt first if any of `keys` sits at a position that no longer holds it (a direct edit)."""
+    lookup = kg.lookup()
+    items, positions = getattr(kg, section), getattr(lookup, f"{section[:-1]}_positions")
+    if any(key in positions and key_of(items[positions[key]]) != key for key in keys):
+        lookup = kg.lookup(rebuild=True)
+    return lookup
+
+def events_between(kg: KnowledgeGraph, start, end) -> List[Event]:
+    """Events that happened (or, without an extracted date, were recorded) in [start, end], oldest first."""
+    event_ids = kg.time_index.event_ids_between(start, end)
+    positions = _checked_lookup(kg, "events", event_ids, lambda event: event.id).event_positions
+    return [kg.events[positions[event_id]] for event_id in event_ids if event_id in positions]
+
+def relationships_between(kg: KnowledgeGraph, start, end) -> List[Relationship]:
+    """Relationships added to the rolodex in [start, end], oldest first."""
+    rel_tuples = kg.time_index.relationship_tuples_between(start, end)
+    positions = _checked_lookup(kg, "relationships", rel_tuples, lambda rel: (rel.source, rel.target, rel.type)).relationship_positions
+    return [kg.relationships[positions[rel_tuple]] for rel_tuple in rel_tuples if rel_tuple in positions]
+
+def persons_met_between(kg: KnowledgeGraph, start, end) -> List[Person]:
+    """Persons who attended, or are linked to, an event in [start, end]. Only the window's events and their edges are visited."""
+    events = events_between(kg, start, end)  # Rebuilds the lookup first if it is stale
+    lookup = kg.lookup()
+    met_ids = set()
+    for event in events:
+        met_ids.update(event.attendees or [])
+        for position in lookup.edges_by_node.get(event.id, []):
+            rel = kg.relationships[position]
+            if event.id in (rel.source, rel.target):
+                met_ids.add(rel.source if rel.target == event.id else rel.target)
+    lookup = _checked_lookup(kg, "persons", met_ids, lambda person: person.id)
+    return [kg.persons[position] for position in sorted(lookup.person_positions[pid] for pid in met_ids if pid in lookup.person_positions)]
+
+# --- Partial Commit (pending edge queue) ---
+
+def split_pending_relationships(extracted_relationships: List[Relationship], pending_person_ids: Set[str]) -> Tuple[List[Relationship], List[Relationship]]:
+    """Splits relationships into those that can be merged now and those that involve a pending person."""
+    ready, pending = [], []
     for rel in extracted_relationships:
-        source_id = normalize_id(rel.source) # Normalize IDs just in case
-        target_id = normalize_id(rel.target)
-        rel_type = rel.type.upper() # Standardize relationship type case
-
-        # Check if source and target nodes exist in the updated graph
-        source_exists = source_id in all_person_ids or source_id in all_event_ids
-        target_exists = target_id in all_person_ids or target_id in all_event_ids
-
-        if not source_exists:
-            logging.warning(f"Skipping relationship: Source node '{source_id}' not found in KG.")
-            continue
-        if not target_exists:
-            logging.warning(f"Skipping relationship: Target node '{target_id}' not found in KG.")
-            continue
-
-        rel_tuple = (source_id, target_id, rel_type)
-        if rel_tuple not in current_relationships and rel_tuple not in rels_added_this_run:
-             # Recreate relationship with normalized IDs and type
-            updated_kg.relationships.append(Relationship(source=source_id, target=target_id, type=rel_type, context=rel.context))
-            current_relationships.add(rel_tuple)
-            rels_added_this_run.add(rel_tuple)
-            logging.info(f"Adding new relationship: {source_id} -[{rel_type}]-> {target_id}")
-
-    return updated_kg
+        if normalize_id(rel.source) in pending_person_ids or normalize_id(rel.target) in pending_person_ids:
+            pending.append(rel)
+        else:
+            ready.append(rel)
+    return ready, pending
+
+def enqueue_pending_edges(pending_edges: PendingEdges, new_persons: List[Person], extracted_events: List[Event], pending_relationships: List[Relationship]) -> PendingEdges:
+    """Adds new persons and the relationships that depend on them to the pending queue, without duplicates.
+    Events referenced by the queued relationships are kept too, so the queue can be resolved on its own."""
+    updated = pending_edges.model_copy(deep=True)
+
+    queued_person_ids = updated.get_person_ids()
+    for person in new_persons:
+        if person.id not in queued_person_ids:
+            updated.persons.append(person)
+            queued_person_ids.add(person.id)
+
+    queued_rels = {(normalize_id(r.source), normalize_id(r.target), r.type.upper()) for r in updated.relationships}
+    referenced_ids = set()
+    for rel in pending_relationships:
+        rel_tuple = (normalize_id(rel.source), normalize_id(rel.target), rel.type.upper())
+        referenced_ids.update(rel_tuple[:2])
+        if rel_tuple not in queued_rels:
+            updated.relationships.append(rel)
+            queued_rels.add(rel_tuple)
+
+    queued_event_ids = {normalize_id(e.id if e.id else e.description[:30]) for e in updated.events}
+    for event in extracted_events:
+        event_id = normalize_id(event.id if event.id else event.description[:30])
+        if event_id in referenced_ids and event_id not in queued_event_ids:
+            updated.events.append(event)
+            queued_event_ids.add(event_id)
+
+    logging.info(f"Pending queue now holds {len(updated.persons)} persons and {len(updated.relationships)} relationships.")
+    return updated
+
+def resolve_pending_edges(current_kg: KnowledgeGraph, pending_edges: PendingEdges, confirmed_persons: List[Person]) -> Tuple[KnowledgeGraph, MergeDelta]:
+    """Merges the whole pending queue in one batch. Edges touching rejected persons are dropped by merge_confirmed_data.
+    Returns the updated graph and what was added."""
+    pending_ids = pending_edges.get_person_ids()
+    return merge_confirmed_data_with_delta(
+        current_kg=current_kg,
+        confirmed_persons=[p for p in confirmed_persons if p.id in pending_ids],
+        extracted_events=pending_edges.events,
+        extracted_relationships=pending_edges.relationships
+    )
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+from pydantic.json_schema import SkipJsonSchema
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta, timezone
 import re
 
 # --- Pydantic Models for Knowledge Graph (Simple Ontology) ---
@@ -13,17 +16,155 @@ class Event(BaseModel):
     id: str = Field(..., description="Unique identifier for the event (e.g., 'meeting_at_cafe_2024').")
     description: str = Field(..., description="A brief description of the event.")
     attendees: Optional[List[str]] = Field(default_factory=list, description="List of person IDs who attended the event.")
+    occurred_at: Optional[date] = Field(None, description="The date the event happened, if the story says or implies it (ISO format).")
+    # Set by the app when merged, hidden from the extraction schema
+    ingested_at: SkipJsonSchema[Optional[datetime]] = None
 
 class Relationship(BaseModel):
     source: str = Field(..., description="The ID of the source node (Person or Event).")
     target: str = Field(..., description="The ID of the target node (Person or Event).")
     type: str = Field(..., description="The type of relationship (e.g., 'KNOWS', 'ATTENDED').")
     context: Optional[str] = Field(None, description="Optional context about the relationship derived from the story.")
+    ingested_at: SkipJsonSchema[Optional[datetime]] = None
+
+def to_utc(value) -> datetime:
+    """Coerces a date or (naive) datetime to an aware UTC datetime so they can be compared."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+def _entry_time(entry: tuple) -> datetime:
+    return entry[0]
+
+class TimeIndex(BaseModel):
+    """Entries kept sorted by time so range queries are two bisects instead of a scan."""
+    events: List[Tuple[datetime, str]] = Field(default_factory=list, description="(occurred_at or ingested_at, event id)")
+    relationships: List[Tuple[datetime, str, str, str]] = Field(default_factory=list, description="(ingested_at, source, target, type)")
+
+    def add_event(self, event: "Event"):
+        self.add_events([event])
+
+    def add_relationship(self, rel: "Relationship"):
+        self.add_relationships([rel])
+
+    def add_events(self, events: List["Event"]):
+        self._insert(self.events, [
+            (to_utc(event.occurred_at or event.ingested_at), event.id)
+            for event in events if (event.occurred_at or event.ingested_at) is not None
+        ])
+
+    def add_relationships(self, rels: List["Relationship"]):
+        self._insert(self.relationships, [
+            (to_utc(rel.ingested_at), rel.source, rel.target, rel.type)
+            for rel in rels if rel.ingested_at is not None
+        ])
+
+    def remove_events(self, events: List["Event"]):
+        self._remove(self.events, [(to_utc(e.occurred_at or e.ingested_at), e.id) for e in events if (e.occurred_at or e.ingested_at) is not None])
+
+    def remove_relationships(self, rels: List["Relationship"]):
+        self._remove(self.relationships, [(to_utc(r.ingested_at), r.source, r.target, r.type) for r in rels if r.ingested_at is not None])
+
+    @staticmethod
+    def _remove(entries: list, old_entries: list):
+        # Entries of the latest merge are the newest, so undoing it mostly pops from the tail
+        for entry in reversed(old_entries):
+            if entries and entries[-1] == entry:
+                entries.pop()
+                continue
+            i = bisect_left(entries, entry[0], key=_entry_time)
+            while i < len(entries) and entries[i][0] == entry[0]:
+                if entries[i] == entry:
+                    del entries[i]
+                    break
+                i += 1
+
+    @staticmethod
+    def _insert(entries: list, new_entries: list):
+        # A handful of entries: insort each. A large batch: append and let timsort merge the sorted runs.
+        if len(new_entries) < 64:
+            for entry in new_entries:
+                insort(entries, entry, key=_entry_time)
+        else:
+            entries.extend(new_entries)
+            entries.sort(key=_entry_time)
+
+    def event_ids_between(self, start, end) -> List[str]:
+        """Event ids whose time falls in [start, end]."""
+        return [entry[1] for entry in self._window(self.events, start, end)]
+
+    def relationship_tuples_between(self, start, end) -> List[Tuple[str, str, str]]:
+        """(source, target, type) of relationships ingested in [start, end]."""
+        return [entry[1:] for entry in self._window(self.relationships, start, end)]
+
+    @staticmethod
+    def _window(entries: list, start, end) -> list:
+        lo = bisect_left(entries, to_utc(start), key=_entry_time)
+        if isinstance(end, datetime):
+            hi = bisect_right(entries, to_utc(end), key=_entry_time)
+        else:  # A plain end date covers that whole day
+            hi = bisect_left(entries, to_utc(end + timedelta(days=1)), key=_entry_time)
+        return entries[lo:hi]
+
+class GraphLookup:
+    """
+    Positions of nodes and edges in a graph's lists, by key, so queries can go straight to the matches.
+    Built once per graph and extended as it is appended to (see KnowledgeGraph.lookup).
+    """
+    def __init__(self):
+        self.counts: Tuple[int, int, int] = (0, 0, 0)
+        self.person_positions: Dict[str, int] = {}
+        self.event_positions: Dict[str, int] = {}
+        self.relationship_positions: Dict[Tuple[str, str, str], int] = {}
+        self.edges_by_node: Dict[str, List[int]] = {}  # Node id -> positions of the relationships touching it, ascending
+
+    def __eq__(self, other) -> bool:
+        # A cache derived from the graph's content, so it never makes two graphs unequal
+        return isinstance(other, GraphLookup)
+
+    def extend(self, kg: "KnowledgeGraph", counts_from: Tuple[int, int, int]):
+        """Indexes what kg appended after its lists were `counts_from` long."""
+        persons_from, events_from, relationships_from = counts_from
+        for position in range(persons_from, len(kg.persons)):
+            self.person_positions.setdefault(kg.persons[position].id, position)
+        for position in range(events_from, len(kg.events)):
+            self.event_positions.setdefault(kg.events[position].id, position)
+        for position in range(relationships_from, len(kg.relationships)):
+            rel = kg.relationships[position]
+            self.relationship_positions.setdefault((rel.source, rel.target, rel.type), position)
+            self.edges_by_node.setdefault(rel.source, []).append(position)
+            if rel.target != rel.source:
+                self.edges_by_node.setdefault(rel.target, []).append(position)
+        self.counts = kg.counts()
+
+    def truncate(self, counts: Tuple[int, int, int], removed: "MergeDelta"):
+        """Forgets the items `removed` from the tails of the lists, which are now `counts` long."""
+        persons_to, events_to, relationships_to = counts
+        for person in removed.persons:
+            if self.person_positions.get(person.id, -1) >= persons_to:
+                del self.person_positions[person.id]
+        for event in removed.events:
+            if self.event_positions.get(event.id, -1) >= events_to:
+                del self.event_positions[event.id]
+        for rel in removed.relationships:
+            rel_tuple = (rel.source, rel.target, rel.type)
+            if self.relationship_positions.get(rel_tuple, -1) >= relationships_to:
+                del self.relationship_positions[rel_tuple]
+            for node_id in {rel.source, rel.target}:
+                positions = self.edges_by_node.get(node_id, [])
+                while positions and positions[-1] >= relationships_to:
+                    positions.pop()
+        self.counts = counts
 
 class KnowledgeGraph(BaseModel):
     persons: List[Person] = Field(default_factory=list)
     events: List[Event] = Field(default_factory=list)
     relationships: List[Relationship] = Field(default_factory=list)
+    # Maintained by merge_confirmed_data and persisted with the graph, hidden from the extraction schema
+    time_index: SkipJsonSchema[TimeIndex] = Field(default_factory=TimeIndex)
+
+    # Built on the first windowed query; the merge helpers keep it in step with their in-place changes
+    _lookup: Optional[GraphLookup] = PrivateAttr(None)
 
     def get_person_ids(self) -> set[str]:
         return {p.id for p in self.persons}
@@ -34,6 +175,47 @@ class KnowledgeGraph(BaseModel):
     def get_relationship_tuples(self) -> set[tuple[str, str, str]]:
         return {(r.source, r.target, r.type) for r in self.relationships}
 
+    def counts(self) -> Tuple[int, int, int]:
+        return (len(self.persons), len(self.events), len(self.relationships))
+
+    def lookup(self, rebuild: bool = False) -> GraphLookup:
+        """
+        Key -> position lookups, kept between calls. Rebuilt when the list lengths show they changed behind the
+        merge helpers' back; queries that find a position no longer holding its key ask for a rebuild too.
+        """
+        if rebuild or self._lookup is None or self._lookup.counts != self.counts():
+            self._lookup = GraphLookup()
+            self._lookup.extend(self, (0, 0, 0))
+        return self._lookup
+
+    def index_appended(self, counts_before: Tuple[int, int, int]):
+        """Extends the lookup, if one was built, with what was just appended in place (GraphMerger, replay_delta)."""
+        if self._lookup is not None and self._lookup.counts == counts_before:
+            self._lookup.extend(self, counts_before)
+
+    def index_truncated(self, counts_before: Tuple[int, int, int], removed: "MergeDelta"):
+        """Drops from the lookup, if one was built, the items `removed` was just cut off the lists (revert_delta)."""
+        if self._lookup is not None and self._lookup.counts == counts_before:
+            self._lookup.truncate(self.counts(), removed)
+
+class MergeDelta(BaseModel):
+    """The nodes and edges a single merge appended to the graph."""
+    persons: List[Person] = Field(default_factory=list)
+    events: List[Event] = Field(default_factory=list)
+    relationships: List[Relationship] = Field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not self.persons and not self.events and not self.relationships
+
+class PendingEdges(BaseModel):
+    """Extracted data that depends on new persons the user has not confirmed yet (partial-commit mode)."""
+    persons: List[Person] = Field(default_factory=list, description="New persons awaiting confirmation.")
+    events: List[Event] = Field(default_factory=list, description="Events referenced by the pending relationships.")
+    relationships: List[Relationship] = Field(default_factory=list, description="Relationships involving at least one pending person.")
+
+    def get_person_ids(self) -> set[str]:
+        return {p.id for p in self.persons}
+
 # --- Utility Functions ---
 
 def normalize_id(name: str) -> str:
@@ -0,0 +1,117 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Tuple
+from pydantic import ValidationError
+from .models import KnowledgeGraph, MergeDelta, Person, Event, Relationship, normalize_id
+from .kg_utils import replay_delta
+
+# --- Parallel Merge Engine (bulk backfills) ---
+# Map: fragments (raw extraction dicts or KnowledgeGraph objects) are sharded across a process pool,
+#      where the CPU-heavy work happens: pydantic validation, normalize_id on every field, and
+#      de-duplication within each fragment.
+# Reduce: the normalized fragments are folded in input order into one MergeDelta, applying exactly the
+#      rules of identify_new_persons + merge_confirmed_data run fragment by fragment (first occurrence wins,
+#      relationships need both nodes to exist by their own fragment). The delta is applied to the graph once.
+
+# (fragment index, persons, events, relationships), all as plain tuples to keep inter-process traffic small
+NormalizedFragment = Tuple[int, List[tuple], List[tuple], List[tuple]]
+
+def _normalize_fragment(index: int, fragment: Any) -> Optional[NormalizedFragment]:
+    try:
+        kg = fragment if isinstance(fragment, KnowledgeGraph) else KnowledgeGraph.model_validate(fragment)
+    except ValidationError as e:
+        logging.warning(f"Skipping invalid fragment {index}: {e}")
+        return None
+
+    persons, seen_persons = [], set()
+    for person in kg.persons:
+        person_id = normalize_id(person.name)  # Same as identify_new_persons
+        if person_id and person_id not in seen_persons:
+            persons.append((person_id, person.name))
+            seen_persons.add(person_id)
+
+    events, seen_events = [], set()
+    for event in kg.events:
+        event_id = normalize_id(event.id if event.id else event.description[:30])
+        if event_id and event_id not in seen_events:
+            events.append((event_id, event.description, event.attendees, event.occurred_at, event.ingested_at))
+            seen_events.add(event_id)
+
+    relationships, seen_relationships = [], set()
+    for rel in kg.relationships:
+        rel_tuple = (normalize_id(rel.source), normalize_id(rel.target), rel.type.upper())
+        if rel_tuple not in seen_relationships:
+            relationships.append(rel_tuple + (rel.context, rel.ingested_at))
+            seen_relationships.add(rel_tuple)
+
+    return (index, persons, events, relationships)
+
+def _normalize_shard(shard: List[Tuple[int, Any]]) -> List[NormalizedFragment]:
+    results = (_normalize_fragment(index, fragment) for index, fragment in shard)
+    return [result for result in results if result is not None]
+
+def _shards(fragments: List[Any], shard_count: int) -> List[List[Tuple[int, Any]]]:
+    """Contiguous shards, so each worker gets a similar share and results come back in order."""
+    indexed = list(enumerate(fragments))
+    size = max(1, -(-len(indexed) // shard_count))
+    return [indexed[i:i + size] for i in range(0, len(indexed), size)]
+
+class ParallelMerger:
+    def __init__(self, workers: Optional[int] = None, shards_per_worker: int = 4):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.shards_per_worker = max(1, shards_per_worker)
+
+    def normalize(self, fragments: Iterable[Any]) -> List[NormalizedFragment]:
+        """Map phase: validate and normalize every fragment, in a process pool when workers > 1."""
+        fragments = list(fragments)
+        if self.workers == 1:
+            return _normalize_shard(list(enumerate(fragments)))
+        shards = _shards(fragments, self.workers * self.shards_per_worker)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # map() yields shard results in submission order, so the output order is deterministic
+            return [fragment for shard_result in pool.map(_normalize_shard, shards) for fragment in shard_result]
+
+    def build_delta(self, current_kg: KnowledgeGraph, fragments: Iterable[Any], ingested_at: Optional[datetime] = None) -> MergeDelta:
+        """Reduce phase: fold the normalized fragments, in input order, into the delta a serial merge would produce."""
+        ingested_at = ingested_at or datetime.now(timezone.utc)
+        person_ids = current_kg.get_person_ids()
+        event_ids = current_kg.get_event_ids()
+        relationship_tuples = current_kg.get_relationship_tuples()
+        delta = MergeDelta()
+
+        for _, persons, events, relationships in sorted(self.normalize(fragments), key=lambda result: result[0]):
+            for person_id, name in persons:
+                if person_id not in person_ids:
+                    delta.persons.append(Person.model_construct(id=person_id, name=name))
+                    person_ids.add(person_id)
+            for event_id, description, attendees, occurred_at, event_ingested_at in events:
+                if event_id not in event_ids:
+                    delta.events.append(Event.model_construct(
+                        id=event_id, description=description, attendees=attendees,
+                        occurred_at=occurred_at, ingested_at=event_ingested_at or ingested_at,
+                    ))
+                    event_ids.add(event_id)
+            for source_id, target_id, rel_type, context, rel_ingested_at in relationships:
+                # Nodes must exist by this fragment, as they would when merging fragment by fragment
+                if source_id not in person_ids and source_id not in event_ids:
+                    continue
+                if target_id not in person_ids and target_id not in event_ids:
+                    continue
+                if (source_id, target_id, rel_type) not in relationship_tuples:
+                    delta.relationships.append(Relationship.model_construct(
+                        source=source_id, target=target_id, type=rel_type, context=context,
+                        ingested_at=rel_ingested_at or ingested_at,
+                    ))
+                    relationship_tuples.add((source_id, target_id, rel_type))
+
+        logging.info(f"Parallel merge delta: +{len(delta.persons)} persons, +{len(delta.events)} events, +{len(delta.relationships)} relationships.")
+        return delta
+
+    def merge(self, current_kg: KnowledgeGraph, fragments: Iterable[Any], ingested_at: Optional[datetime] = None) -> KnowledgeGraph:
+        """Merges all fragments (every new person confirmed) into a copy of current_kg in one application."""
+        delta = self.build_delta(current_kg, fragments, ingested_at=ingested_at)
+        updated_kg = current_kg.model_copy(deep=True)
+        replay_delta(updated_kg, delta)
+        return updated_kg
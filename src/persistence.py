@@ -1,46 +1,217 @@
 import os
 import json
 import logging
-from typing import List, Dict
-from .models import KnowledgeGraph
-from .config import KG_FILE, CHAT_HISTORY_FILE
+import textwrap
+from typing import Dict, Iterable, Iterator, List, Union
+from pydantic_core import to_jsonable_python
+from .models import KnowledgeGraph, PendingEdges, Person, Event, Relationship, TimeIndex
+from .kg_utils import rebuild_time_index
+from .config import KG_FILE, CHAT_HISTORY_FILE, PENDING_EDGES_FILE
+
+# --- Streaming JSON ---
+# knowledge_graph.json is one object of large arrays. It is read and written one array item at a time,
+# so neither the document text nor its parsed dict is ever held in memory as a whole.
+
+class _JsonStream:
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expected {char!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decodes one (small) value: an array item, or an object key."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self.buffer) and self._fill():
+                continue  # A number at the end of the buffer may go on in the next chunk
+            self.pos = end
+            return value
+
+    def elements(self) -> Iterator[None]:
+        """Steps through the array here; the caller consumes each element when it is yielded."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("]")
+                return
+
+    def items(self) -> Iterator:
+        for _ in self.elements():
+            yield self.value()
+
+    def keys(self) -> Iterator[str]:
+        """Steps through the object here; the caller consumes each key's value when the key is yielded."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+            else:
+                self.expect("}")
+                return
+
+    def skip(self):
+        if self.peek() == "{":
+            for _ in self.keys():
+                self.skip()
+        elif self.peek() == "[":
+            for _ in self.elements():
+                self.skip()
+        else:
+            self.value()
+
+_KG_SECTIONS = {"persons": Person, "events": Event, "relationships": Relationship}
+
+def _write_json_array(f, name: str, items: Iterable, indent: int, last: bool = False):
+    """Writes '"name": [...]' item by item, laid out like json.dump(..., indent=2)."""
+    f.write(f"{' ' * indent}{json.dumps(name)}: [")
+    empty = True
+    for item in items:
+        f.write(("\n" if empty else ",\n") + textwrap.indent(json.dumps(item, indent=2), " " * (indent + 2)))
+        empty = False
+    f.write(("]" if empty else f"\n{' ' * indent}]") + ("\n" if last else ",\n"))
 
 # --- Knowledge Graph Persistence (JSON) ---
-def load_kg() -> KnowledgeGraph:
+def iter_saved_kg(path: str = KG_FILE) -> Iterator[Union[Person, Event, Relationship]]:
+    """Streams the persons, events and relationships of a saved graph without loading it."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        stream = _JsonStream(f)
+        if not stream.peek():
+            return
+        for key in stream.keys():
+            if key in _KG_SECTIONS:
+                for item in stream.items():
+                    yield _KG_SECTIONS[key](**item)
+            else:
+                stream.skip()
+
+def load_kg(path: str = KG_FILE) -> KnowledgeGraph:
     """Loads the knowledge graph from the JSON file."""
     try:
-        if os.path.exists(KG_FILE):
-            with open(KG_FILE, 'r') as f:
-                data = json.load(f)
-                # Handle potential empty file or invalid JSON
-                if not data:
-                    logging.warning(f"{KG_FILE} is empty, returning new graph.")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                stream = _JsonStream(f)
+                # Handle potential empty file
+                if not stream.peek():
+                    logging.warning(f"{path} is empty, returning new graph.")
                     return KnowledgeGraph()
-                return KnowledgeGraph(**data)
+                sections, time_index = {}, None
+                for key in stream.keys():
+                    if key in _KG_SECTIONS:
+                        sections[key] = [_KG_SECTIONS[key](**item) for item in stream.items()]
+                    elif key == "time_index":
+                        time_index = TimeIndex(**{name: list(stream.items()) for name in stream.keys()})
+                    else:
+                        stream.skip()
+                kg = KnowledgeGraph(**sections)
+                # Graphs saved before the time index existed
+                kg.time_index = time_index if time_index is not None else rebuild_time_index(kg)
+                return kg
         else:
-            logging.info(f"{KG_FILE} not found, creating a new empty graph.")
+            logging.info(f"{path} not found, creating a new empty graph.")
             return KnowledgeGraph() # Return empty graph if file doesn't exist
     except (json.JSONDecodeError, IOError, TypeError, ValueError) as e: # Added ValueError for Pydantic validation
-        logging.error(f"Error loading knowledge graph from {KG_FILE}: {e}")
+        logging.error(f"Error loading knowledge graph from {path}: {e}")
         # Don't use st.warning here as this module shouldn't depend on streamlit
-        print(f"Warning: Could not load existing knowledge graph from {KG_FILE}, starting fresh. Error: {e}")
+        print(f"Warning: Could not load existing knowledge graph from {path}, starting fresh. Error: {e}")
         return KnowledgeGraph() # Return empty graph on error
 
-def save_kg(kg: KnowledgeGraph):
-    """Saves the knowledge graph to the JSON file."""
+def save_kg(kg: KnowledgeGraph, path: str = KG_FILE):
+    """Saves the knowledge graph to the JSON file, item by item, via a temp file so a crash never leaves it truncated."""
+    tmp_file = f"{path}.tmp"
     try:
-        with open(KG_FILE, 'w') as f:
-            json.dump(kg.model_dump(mode='json'), f, indent=2) # Use model_dump for Pydantic v2+
-        logging.info(f"Knowledge graph saved to {KG_FILE}")
+        with open(tmp_file, 'w') as f:
+            f.write("{\n")
+            for name in _KG_SECTIONS:
+                _write_json_array(f, name, (item.model_dump(mode='json') for item in getattr(kg, name)), indent=2)
+            f.write('  "time_index": {\n')
+            _write_json_array(f, "events", map(to_jsonable_python, kg.time_index.events), indent=4)
+            _write_json_array(f, "relationships", map(to_jsonable_python, kg.time_index.relationships), indent=4, last=True)
+            f.write("  }\n}")
+        os.replace(tmp_file, path)
+        logging.info(f"Knowledge graph saved to {path}")
     except IOError as e:
-        logging.error(f"Error saving knowledge graph to {KG_FILE}: {e}")
+        logging.error(f"Error saving knowledge graph to {path}: {e}")
         # Don't use st.error here
-        print(f"Error: Failed to save knowledge graph to {KG_FILE}: {e}")
+        print(f"Error: Failed to save knowledge graph to {path}: {e}")
     except Exception as e: # Catch potential Pydantic errors during dump
         logging.error(f"Error dumping knowledge graph model: {e}")
         print(f"Error: Failed to serialize knowledge graph: {e}")
 
 
+# --- Pending Edge Queue Persistence ---
+def load_pending_edges() -> PendingEdges:
+    """Loads the queue of edges awaiting person confirmation."""
+    try:
+        if os.path.exists(PENDING_EDGES_FILE):
+            with open(PENDING_EDGES_FILE, 'r') as f:
+                data = json.load(f)
+                if not data:
+                    return PendingEdges()
+                return PendingEdges(**data)
+        return PendingEdges()
+    except (json.JSONDecodeError, IOError, TypeError, ValueError) as e:
+        logging.error(f"Error loading pending edges from {PENDING_EDGES_FILE}: {e}")
+        return PendingEdges()
+
+def save_pending_edges(pending_edges: PendingEdges):
+    """Saves the pending edge queue. Written to a temp file and renamed so a crash never leaves it truncated."""
+    tmp_file = f"{PENDING_EDGES_FILE}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(pending_edges.model_dump(mode='json'), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, PENDING_EDGES_FILE)
+        logging.info(f"Pending edges saved to {PENDING_EDGES_FILE}")
+    except (IOError, OSError) as e:
+        logging.error(f"Error saving pending edges to {PENDING_EDGES_FILE}: {e}")
+
+
 # --- Chat History Persistence ---
 def load_chat_history() -> List[Dict]:
     """Loads chat history from the JSON file."""
@@ -1,2 +1,5 @@
 from .deepgram_service import DeepgramService
-from .instructor_service import InstructorService 
\ No newline at end of file
+from .instructor_service import InstructorService
+from .local_whisper_service import LocalWhisperService
+from .rule_based_extractor import RuleBasedExtractor
+from .backend_router import TranscriptionRouter, ExtractionRouter, build_transcriber, build_extractor 
\ No newline at end of file
@@ -0,0 +1,124 @@
+import io
+import logging
+import time
+import wave
+from typing import List, Optional
+import instructor
+from ..config import (
+    TRANSCRIPTION_BACKEND, EXTRACTION_BACKEND, LOCAL_FALLBACK, LOCAL_LLM_BASE_URL, LOCAL_LLM_MODEL,
+    ROUTER_SHORT_STORY_WORDS, ROUTER_SHORT_AUDIO_SECONDS,
+)
+from ..models import KnowledgeGraph
+from .base import TranscriptionBackend, ExtractionBackend
+from .local_whisper_service import LocalWhisperService
+from .rule_based_extractor import RuleBasedExtractor
+from .instructor_service import InstructorService
+
+# --- Backend Routing ---
+# "remote" keeps the API backends; with LOCAL_FALLBACK it falls back to local ones when they fail (e.g.
+# offline), otherwise a failure is reported as such. An empty answer from the remote backend is still an
+# answer. "local" never calls a remote API.
+# "auto" sends short inputs down the fast local path first and uses the remote backend for long
+# inputs, or when the local result is empty.
+
+def audio_duration_seconds(audio_data: bytes) -> Optional[float]:
+    """Duration of a WAV buffer, or None for other containers."""
+    try:
+        with wave.open(io.BytesIO(audio_data), 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError, ZeroDivisionError):
+        return None
+
+class TranscriptionRouter(TranscriptionBackend):
+    name = "transcription_router"
+
+    def __init__(self, remote: TranscriptionBackend, local: TranscriptionBackend, mode: str = TRANSCRIPTION_BACKEND,
+                 short_audio_seconds: float = ROUTER_SHORT_AUDIO_SECONDS, local_fallback: bool = LOCAL_FALLBACK):
+        self.remote = remote
+        self.local = local
+        self.mode = mode
+        self.short_audio_seconds = short_audio_seconds
+        self.local_fallback = local_fallback
+
+    def backends_for(self, audio_data: bytes) -> List[TranscriptionBackend]:
+        if self.mode == "local":
+            return [self.local]
+        if self.mode == "auto":
+            duration = audio_duration_seconds(audio_data)
+            if duration is not None and duration <= self.short_audio_seconds:
+                return [self.local, self.remote]
+            return [self.remote, self.local]
+        return [self.remote, self.local] if self.local_fallback else [self.remote]
+
+    def is_available(self) -> bool:
+        return self.remote.is_available() or self.local.is_available()
+
+    async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
+        for backend in self.backends_for(audio_data):
+            if not backend.is_available():
+                continue
+            start = time.perf_counter()
+            transcript = await backend.transcribe_audio(audio_data)
+            logging.info(f"Transcription via {backend.name} took {time.perf_counter() - start:.2f}s.")
+            if transcript:
+                return transcript
+        logging.error("No transcription backend produced a transcript.")
+        return None
+
+class ExtractionRouter(ExtractionBackend):
+    name = "extraction_router"
+
+    def __init__(self, remote: ExtractionBackend, local: List[ExtractionBackend], mode: str = EXTRACTION_BACKEND,
+                 short_story_words: int = ROUTER_SHORT_STORY_WORDS, local_fallback: bool = LOCAL_FALLBACK):
+        """local is ordered best-first, e.g. [local LLM, rule-based]."""
+        self.remote = remote
+        self.local = local
+        self.mode = mode
+        self.short_story_words = short_story_words
+        self.local_fallback = local_fallback
+
+    def backends_for(self, text: str) -> List[ExtractionBackend]:
+        rules = [backend for backend in self.local if isinstance(backend, RuleBasedExtractor)]
+        if self.mode == "rules":
+            return rules
+        if self.mode == "local":
+            return list(self.local)
+        if self.mode == "auto":
+            if len(text.split()) <= self.short_story_words:
+                return list(self.local) + [self.remote]
+            return [self.remote] + list(self.local)
+        return [self.remote] + list(self.local) if self.local_fallback else [self.remote]
+
+    def is_available(self) -> bool:
+        return any(backend.is_available() for backend in [self.remote] + self.local)
+
+    async def extract_kg_data(self, text: str) -> Optional[KnowledgeGraph]:
+        fallback: Optional[KnowledgeGraph] = None
+        for backend in self.backends_for(text or ""):
+            if not backend.is_available():
+                continue
+            start = time.perf_counter()
+            extracted_graph = await backend.extract_kg_data(text)
+            logging.info(f"Extraction via {backend.name} took {time.perf_counter() - start:.2f}s.")
+            if backend is self.remote and extracted_graph is not None:
+                return extracted_graph  # Only a failed remote call falls through to the local backends
+            if extracted_graph is not None and extracted_graph.persons:
+                return extracted_graph
+            # An empty local graph may just mean there was nothing to find; keep it unless a later backend does better
+            fallback = fallback or extracted_graph
+        return fallback
+
+def build_local_llm_extractor() -> Optional[InstructorService]:
+    """An InstructorService pointed at a local OpenAI-compatible server, if LOCAL_LLM_MODEL is set."""
+    if not LOCAL_LLM_MODEL:
+        return None
+    local_llm = InstructorService(model=LOCAL_LLM_MODEL, base_url=LOCAL_LLM_BASE_URL, api_key="local", mode=instructor.Mode.JSON)
+    local_llm.name = f"local_llm:{LOCAL_LLM_MODEL}"
+    return local_llm
+
+def build_transcriber(remote: TranscriptionBackend) -> TranscriptionBackend:
+    return TranscriptionRouter(remote=remote, local=LocalWhisperService())
+
+def build_extractor(remote: ExtractionBackend) -> ExtractionBackend:
+    local = [backend for backend in (build_local_llm_extractor(), RuleBasedExtractor()) if backend is not None]
+    return ExtractionRouter(remote=remote, local=local)
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from ..models import KnowledgeGraph
+
+# --- Backend Interfaces ---
+# Every transcription/extraction implementation (remote API, local model, rules) exposes the same
+# async methods, so the router and the rest of the app never care which one is behind them.
+
+class TranscriptionBackend(ABC):
+    name = "transcription"
+
+    @abstractmethod
+    async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
+        """Returns the transcript, or None on failure."""
+
+    def is_available(self) -> bool:
+        return True
+
+class ExtractionBackend(ABC):
+    name = "extraction"
+
+    @abstractmethod
+    async def extract_kg_data(self, text: str) -> Optional[KnowledgeGraph]:
+        """Returns the extracted graph, or None on failure."""
+
+    def is_available(self) -> bool:
+        return True
@@ -2,8 +2,11 @@ import logging
 from typing import Optional
 from deepgram import DeepgramClient, DeepgramClientOptions, SpeakOptions
 from ..config import DEEPGRAM_API_KEY
+from .base import TranscriptionBackend
+
+class DeepgramService(TranscriptionBackend):
+    name = "deepgram"
 
-class DeepgramService:
     def __init__(self):
         try:
             dg_config = DeepgramClientOptions(verbose=logging.WARNING)
@@ -13,6 +16,9 @@ class DeepgramService:
             logging.error(f"Deepgram client initialization failed: {e}")
             self.deepgram_client = None
 
+    def is_available(self) -> bool:
+        return self.deepgram_client is not None and bool(DEEPGRAM_API_KEY)
+
     async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
         if not self.deepgram_client or not audio_data:
             logging.error("Deepgram client not initialized or no audio data provided.")
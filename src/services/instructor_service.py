@@ -1,19 +1,30 @@
 import logging
+from datetime import date
 from typing import Optional
 import instructor
 from openai import OpenAI
 from ..config import OPENAI_API_KEY
 from ..models import KnowledgeGraph
+from .base import ExtractionBackend
 
-class InstructorService:
-    def __init__(self):
+class InstructorService(ExtractionBackend):
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o", base_url: Optional[str] = None, api_key: Optional[str] = OPENAI_API_KEY, mode: Optional[instructor.Mode] = None):
+        """base_url points at any OpenAI-compatible server (e.g. a local Ollama) instead of the OpenAI API."""
+        self.model = model
+        self.api_key = api_key
         try:
-            self.instructor_client = instructor.patch(OpenAI(api_key=OPENAI_API_KEY))
-            logging.info("Instructor client initialized in InstructorService.")
+            client = OpenAI(api_key=api_key, base_url=base_url)
+            self.instructor_client = instructor.patch(client, mode=mode) if mode else instructor.patch(client)
+            logging.info(f"Instructor client initialized in InstructorService (model: {model}).")
         except Exception as e:
             logging.error(f"Instructor client initialization failed: {e}")
             self.instructor_client = None
 
+    def is_available(self) -> bool:
+        return self.instructor_client is not None and bool(self.api_key)
+
     async def extract_kg_data(self, text: str) -> Optional[KnowledgeGraph]:
         if not self.instructor_client or not text:
             logging.error("Instructor client not initialized or no text provided.")
@@ -29,6 +40,7 @@ class InstructorService:
             For each event:
             - Create a unique ID
             - Include a brief description
+            - Set occurred_at to the date it happened if the text states or implies one (resolve relative dates like "last Friday" against today's date)
             For relationships:
             - Identify connections between people (KNOWS, FRIENDS_WITH, etc.)
             - Identify connections between people and events (ATTENDED, ORGANIZED, etc.)
@@ -56,6 +68,7 @@ class InstructorService:
             Always return a complete knowledge graph with all extracted information, even if the text is brief.
             """
             user_prompt = f"""
+            Today's date is {date.today().isoformat()}.
             Please extract a knowledge graph from the following text, identifying all people, events, and relationships:
             {text}
             Return a structured knowledge graph with persons, events, and relationships following the exact format from the example.
@@ -63,7 +76,7 @@ class InstructorService:
             """
             logging.info("Making OpenAI API call with Instructor...")
             extracted_graph = self.instructor_client.chat.completions.create(
-                model="gpt-4o",
+                model=self.model,
                 response_model=KnowledgeGraph,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -0,0 +1,42 @@
+import asyncio
+import importlib.util
+import io
+import logging
+from typing import Optional
+from ..config import LOCAL_STT_MODEL
+from .base import TranscriptionBackend
+
+class LocalWhisperService(TranscriptionBackend):
+    """On-CPU speech-to-text with faster-whisper (optional dependency: pip install faster-whisper)."""
+    name = "local_whisper"
+
+    def __init__(self, model_size: str = LOCAL_STT_MODEL):
+        self.model_size = model_size
+        self.model = None  # Loaded on first use so the app starts quickly when the local path isn't taken
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def _load_model(self):
+        if self.model is None:
+            from faster_whisper import WhisperModel
+            self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+            logging.info(f"Local Whisper model '{self.model_size}' loaded.")
+        return self.model
+
+    def _transcribe(self, audio_data: bytes) -> str:
+        segments, _ = self._load_model().transcribe(io.BytesIO(audio_data), language="en", beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
+        if not audio_data or not self.is_available():
+            logging.error("faster-whisper not installed or no audio data provided.")
+            return None
+        try:
+            logging.info("Transcribing audio locally with Whisper...")
+            transcript = await asyncio.to_thread(self._transcribe, audio_data)
+            logging.info(f"Local transcription received: {transcript[:50]}...")
+            return transcript or None
+        except Exception as e:
+            logging.error(f"Local Whisper transcription error: {e}")
+            return None
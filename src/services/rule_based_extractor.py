@@ -0,0 +1,174 @@
+import logging
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from ..models import KnowledgeGraph, Person, Event, Relationship, normalize_id
+from .base import ExtractionBackend
+
+# --- Rule-based Extraction ---
+# A fast, offline fallback that emits the same KnowledgeGraph schema as the LLM extractor.
+# It only understands simple first-person stories: capitalised names are people, "at/to <Place>"
+# and activity words are events, people in the same sentence as an event attended it, people in
+# the same sentence know each other, and "her boyfriend Mike" / "Sarah's sister Ann" give typed links.
+# A lone capitalised word that starts a sentence ("Had coffee with Tom.") is only a name if the story
+# also capitalises it mid-sentence, is possessive ("Emma's"), or is followed by "and"/"," or a verb
+# ("Alice and Bob met...", "Alice met Bob...").
+
+_NOT_NAMES = {
+    "i", "we", "he", "she", "they", "it", "you", "my", "our", "his", "her", "their", "the", "a", "an",
+    "this", "that", "then", "there", "later", "after", "before", "when", "while", "so", "and", "but",
+    "yesterday", "today", "tonight", "tomorrow", "last", "next", "on", "at", "in", "to", "with",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december", "mr", "mrs", "ms", "dr",
+}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_ACTIVITIES = [
+    "dinner", "lunch", "breakfast", "brunch", "coffee", "drinks", "party", "wedding", "meeting",
+    "concert", "game", "trip", "hike", "birthday", "barbecue", "bbq", "conference", "class", "show",
+]
+_RELATION_TYPES = {
+    "boyfriend": "DATING", "girlfriend": "DATING", "partner": "DATING", "fiance": "ENGAGED_TO", "fiancee": "ENGAGED_TO",
+    "husband": "MARRIED_TO", "wife": "MARRIED_TO", "brother": "SIBLING_OF", "sister": "SIBLING_OF",
+    "mother": "PARENT_OF", "father": "PARENT_OF", "mom": "PARENT_OF", "dad": "PARENT_OF",
+    "son": "CHILD_OF", "daughter": "CHILD_OF", "cousin": "RELATED_TO", "roommate": "LIVES_WITH",
+    "coworker": "WORKS_WITH", "colleague": "WORKS_WITH", "boss": "MANAGES", "friend": "FRIENDS_WITH",
+}
+
+_NAME = r"[A-Z][a-zA-Z'\-]+(?:\s+[A-Z][a-zA-Z'\-]+)*"
+_PLACE_PATTERN = re.compile(r"\b(?:at|to)\s+(?:the\s+)?(" + _NAME + r")")
+_NAME_PATTERN = re.compile(r"\b" + _NAME)
+_RELATION_WORDS = "|".join(_RELATION_TYPES)
+_POSSESSIVE_RELATION = re.compile(r"\b(" + _NAME + r")'s\s+(" + _RELATION_WORDS + r")s?,?\s+(" + _NAME + r")")
+_PRONOUN_RELATION = re.compile(r"\b(?:her|his|their)\s+(" + _RELATION_WORDS + r")s?,?\s+(" + _NAME + r")", re.IGNORECASE)
+_ACTIVITY_PATTERN = re.compile(r"\b(" + "|".join(_ACTIVITIES) + r")\b", re.IGNORECASE)
+_IRREGULAR_PAST = [
+    "met", "said", "told", "took", "came", "went", "got", "had", "made", "saw", "gave", "brought", "left",
+    "paid", "ran", "found", "sent", "bought", "felt", "knew", "thought", "was", "is", "has", "will", "can",
+]
+# What follows a sentence-initial name: another name in a list, or a (past-tense) verb
+_NAME_CONTINUATION = re.compile(r"\s*(?:,|&|and\b|[a-z]+ed\b|(?:" + "|".join(_IRREGULAR_PAST) + r")\b)")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Sentences that refer back to the previous event without naming it
+_BACK_REFERENCE = re.compile(r"\b(there|joined|came along|showed up|stopped by)\b", re.IGNORECASE)
+
+def _strip_leading_stopwords(name: str) -> str:
+    words = re.sub(r"'s$", "", name).split()  # "Emma's" -> "Emma"
+    while words and words[0].lower() in _NOT_NAMES:
+        words = words[1:]
+    return " ".join(words)
+
+def _mid_sentence_names(sentences: List[str]) -> Set[str]:
+    """Lowercased words the story capitalises somewhere other than at the start of a sentence."""
+    words = set()
+    for sentence in sentences:
+        for match in _NAME_PATTERN.finditer(sentence):
+            tokens = match.group(0).split()
+            words.update(re.sub(r"'s$", "", token).lower() for token in (tokens[1:] if match.start() == 0 else tokens))
+    return words
+
+def _resolve_date(sentence: str, today: date) -> Optional[date]:
+    lowered = sentence.lower()
+    if "yesterday" in lowered:
+        return today - timedelta(days=1)
+    if re.search(r"\b(today|tonight|this morning|this afternoon)\b", lowered):
+        return today
+    if "last week" in lowered:
+        return today - timedelta(days=7)
+    match = re.search(r"\b(?:last|on)\s+(" + "|".join(_WEEKDAYS) + r")\b", lowered)
+    if match:
+        days_back = (today.weekday() - _WEEKDAYS.index(match.group(1))) % 7 or 7
+        return today - timedelta(days=days_back)
+    return None
+
+class RuleBasedExtractor(ExtractionBackend):
+    name = "rules"
+
+    def __init__(self, today: Optional[date] = None):
+        self.today = today  # Fixed "today" for reproducible results; defaults to the real date
+
+    async def extract_kg_data(self, text: str) -> Optional[KnowledgeGraph]:
+        if not text:
+            logging.error("No text provided for rule-based extraction.")
+            return None
+        try:
+            extracted_graph = self.extract(text)
+            logging.info(f"Rule-based extraction found {len(extracted_graph.persons)} persons, {len(extracted_graph.events)} events, {len(extracted_graph.relationships)} relationships.")
+            return extracted_graph
+        except Exception as e:
+            logging.error(f"Rule-based extraction error: {e}")
+            return None
+
+    def extract(self, text: str) -> KnowledgeGraph:
+        today = self.today or date.today()
+        persons: Dict[str, Person] = {}
+        events: Dict[str, Event] = {}
+        relationships: Dict[Tuple[str, str], Relationship] = {}
+        last_event_id: Optional[str] = None
+
+        sentences = [sentence for sentence in _SENTENCE_SPLIT.split(text.strip()) if sentence]
+        known_names = _mid_sentence_names(sentences)
+
+        for sentence in sentences:
+
+            # Places first, so "State Street Pub" isn't mistaken for a person
+            place_spans, places = [], []
+            for match in _PLACE_PATTERN.finditer(sentence):
+                place = _strip_leading_stopwords(match.group(1))
+                if place:
+                    places.append(place)
+                    place_spans.append(match.span(1))
+
+            sentence_person_ids: List[str] = []
+            for match in _NAME_PATTERN.finditer(sentence):
+                if any(start <= match.start() < end for start, end in place_spans):
+                    continue
+                name = _strip_leading_stopwords(match.group(0))
+                if (match.start() == 0 and " " not in match.group(0) and not match.group(0).endswith("'s")
+                        and name.lower() not in known_names and not _NAME_CONTINUATION.match(sentence, match.end())):
+                    continue  # Most likely just a capitalised verb ("Had", "Loved")
+                person_id = normalize_id(name)
+                if not person_id or name.lower() in _NOT_NAMES:
+                    continue
+                persons.setdefault(person_id, Person(id=person_id, name=name))
+                if person_id not in sentence_person_ids:
+                    sentence_person_ids.append(person_id)
+
+            # One event per sentence: a named place, else an activity, else a back-reference ("there", "joined us")
+            activity = _ACTIVITY_PATTERN.search(sentence)
+            event_id = None
+            if places or activity:
+                label = " at ".join(filter(None, [activity.group(1).lower() if activity else None, places[0] if places else None]))
+                event_id = normalize_id(label)
+                if event_id not in events:
+                    description = sentence if len(sentence) <= 120 else sentence[:117] + "..."
+                    events[event_id] = Event(id=event_id, description=description, occurred_at=_resolve_date(sentence, today))
+                last_event_id = event_id
+            elif _BACK_REFERENCE.search(sentence):
+                event_id = last_event_id
+
+            if event_id:
+                attendees = events[event_id].attendees
+                for person_id in sentence_person_ids:
+                    if person_id not in attendees:
+                        attendees.append(person_id)
+                    relationships.setdefault((person_id, event_id), Relationship(source=person_id, target=event_id, type="ATTENDED", context=sentence))
+
+            for i, source_id in enumerate(sentence_person_ids):
+                for target_id in sentence_person_ids[i + 1:]:
+                    if (source_id, target_id) not in relationships and (target_id, source_id) not in relationships:
+                        relationships[(source_id, target_id)] = Relationship(source=source_id, target=target_id, type="KNOWS", context=sentence)
+
+            # Typed links override the generic KNOWS for the same pair
+            typed_links = [(m.group(1), m.group(2), m.group(3)) for m in _POSSESSIVE_RELATION.finditer(sentence)]
+            for m in _PRONOUN_RELATION.finditer(sentence):
+                preceding = [pid for pid in sentence_person_ids if sentence.find(persons[pid].name) < m.start()]
+                if preceding:
+                    typed_links.append((persons[preceding[-1]].name, m.group(1), m.group(2)))
+            for source_name, relation, target_name in typed_links:
+                source_id, target_id = normalize_id(source_name), normalize_id(_strip_leading_stopwords(target_name))
+                if source_id in persons and target_id in persons and source_id != target_id:
+                    relationships.pop((target_id, source_id), None)
+                    relationships[(source_id, target_id)] = Relationship(source=source_id, target=target_id, type=_RELATION_TYPES[relation.lower()], context=sentence)
+
+        return KnowledgeGraph(persons=list(persons.values()), events=list(events.values()), relationships=list(relationships.values()))
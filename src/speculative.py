@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AbstractSet, List, Optional, Set
+from pydantic import BaseModel, Field
+from .models import KnowledgeGraph, MergeDelta, Person, Relationship, TimeIndex
+from .kg_utils import identify_new_persons, merge_confirmed_data_with_delta, split_pending_relationships
+from .config import SPECULATIVE_CACHE_SIZE, PARTIAL_COMMIT_MODE
+
+# --- Speculative Pre-processing ---
+# Transcription and extraction are started as soon as audio bytes are available
+# (before the user clicks "Process"), so the result is usually ready by the time it is needed.
+
+def content_hash(audio_data: bytes) -> str:
+    """Returns a stable key for a piece of audio input."""
+    return hashlib.sha256(audio_data).hexdigest()
+
+class SpeculativeResult(BaseModel):
+    audio_hash: str
+    transcript: Optional[str] = None
+    extracted_data: Optional[KnowledgeGraph] = None
+    base_revision: Optional[int] = Field(None, description="Revision of the graph new_persons/candidate_kg were computed against.")
+    pending_person_ids: Set[str] = Field(default_factory=set, description="Persons already in the pending queue at that point.")
+    new_persons: List[Person] = Field(default_factory=list)
+    ready_relationships: List[Relationship] = Field(default_factory=list, description="Partial-commit mode: relationships that don't involve a pending person.")
+    pending_relationships: List[Relationship] = Field(default_factory=list, description="Partial-commit mode: relationships to queue until their persons are confirmed.")
+    candidate_kg: Optional[KnowledgeGraph] = Field(None, description="The merge processing would do: in partial-commit mode, events and the ready relationships; otherwise everything, with every new person confirmed.")
+    candidate_delta: Optional[MergeDelta] = Field(None, description="What that merge added to the graph.")
+
+    def is_current_for(self, revision: int, pending_person_ids: AbstractSet[str] = frozenset()) -> bool:
+        """True if the derived fields were computed against this revision of the graph and this pending queue."""
+        return self.base_revision is not None and self.base_revision == revision and self.pending_person_ids == set(pending_person_ids)
+
+def _snapshot(kg: KnowledgeGraph) -> KnowledgeGraph:
+    """
+    A copy of kg's lists for the worker thread, taken on the caller's thread. The live graph can be changed in place
+    (undo cuts merges off its tails) while a job runs; copying the lists is cheap next to the worker's deep copy.
+    """
+    return KnowledgeGraph.model_construct(
+        persons=list(kg.persons),
+        events=list(kg.events),
+        relationships=list(kg.relationships),
+        time_index=TimeIndex.model_construct(events=list(kg.time_index.events), relationships=list(kg.time_index.relationships)),
+    )
+
+class _SpeculativeJob:
+    def __init__(self, future: Future, cancel_event: threading.Event):
+        self.future = future
+        self.cancel_event = cancel_event
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()  # Only succeeds if the job has not started yet
+
+class SpeculativeProcessor:
+    """Runs the transcribe -> extract -> identify -> merge pipeline in the background, keyed by audio content hash."""
+
+    def __init__(self, transcriber, extractor, max_entries: int = SPECULATIVE_CACHE_SIZE, partial_commit: bool = PARTIAL_COMMIT_MODE):
+        self.transcriber = transcriber
+        self.extractor = extractor
+        self.partial_commit = partial_commit
+        self.max_entries = max(1, max_entries)
+        self._jobs: "OrderedDict[str, _SpeculativeJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative")
+
+    def submit(self, audio_data: bytes, current_kg: KnowledgeGraph, revision: int = 0, pending_person_ids: AbstractSet[str] = frozenset()) -> Optional[str]:
+        """Starts speculative processing for audio_data unless it is already cached.
+        Any in-flight work for a different input is cancelled, since the input has changed."""
+        audio_hashes = self.prefetch([audio_data], current_kg, revision, pending_person_ids)
+        return audio_hashes[0] if audio_hashes else None
+
+    def prefetch(self, inputs: List[bytes], current_kg: KnowledgeGraph, revision: int = 0, pending_person_ids: AbstractSet[str] = frozenset()) -> List[str]:
+        """Starts speculative processing for every current input (e.g. both an upload and a recording), in order,
+        unless already cached. In-flight work for inputs that are no longer current is cancelled.
+        `revision` identifies current_kg's content and `pending_person_ids` the persons already waiting on
+        confirmation; results are tagged with both (see SpeculativeResult.is_current_for)."""
+        inputs = [audio_data for audio_data in inputs if audio_data]
+        audio_hashes = [content_hash(audio_data) for audio_data in inputs]
+        base_kg = None
+        with self._lock:
+            for other_hash, job in self._jobs.items():
+                if other_hash not in audio_hashes and not job.future.done():
+                    logging.info(f"Cancelling stale speculative job {other_hash[:8]}.")
+                    job.cancel()
+
+            for audio_hash, audio_data in zip(audio_hashes, inputs):
+                existing = self._jobs.get(audio_hash)
+                if existing is not None and not existing.future.cancelled():
+                    self._jobs.move_to_end(audio_hash)
+                    continue
+                cancel_event = threading.Event()
+                base_kg = base_kg or _snapshot(current_kg)
+                future = self._executor.submit(self._run, audio_hash, audio_data, base_kg, revision, set(pending_person_ids), cancel_event)
+                self._jobs[audio_hash] = _SpeculativeJob(future, cancel_event)
+                self._jobs.move_to_end(audio_hash)
+                logging.info(f"Started speculative processing for input {audio_hash[:8]}.")
+
+            while len(self._jobs) > self.max_entries:
+                evicted_hash, evicted_job = self._jobs.popitem(last=False)
+                evicted_job.cancel()
+                logging.info(f"Evicted speculative result {evicted_hash[:8]} from cache.")
+        return audio_hashes
+
+    def get(self, audio_data: bytes, timeout: Optional[float] = None) -> Optional[SpeculativeResult]:
+        """Returns the speculative result for audio_data, waiting up to `timeout` seconds if it is still running.
+        Returns None if nothing was submitted for this input, the job was cancelled or failed, or the wait timed out."""
+        if not audio_data:
+            return None
+        with self._lock:
+            job = self._jobs.get(content_hash(audio_data))
+        if job is None or job.future.cancelled():
+            return None
+        try:
+            return job.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logging.warning("Timed out waiting for speculative result, falling back to direct processing.")
+            job.cancel()  # The caller processes the input itself, so free the worker
+            return None
+        except Exception as e:
+            logging.error(f"Speculative processing failed: {e}")
+            return None
+
+    def cancel_all(self):
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+
+    def _run(self, audio_hash: str, audio_data: bytes, current_kg: KnowledgeGraph, base_revision: int,
+             pending_person_ids: Set[str], cancel_event: threading.Event) -> Optional[SpeculativeResult]:
+        if cancel_event.is_set():
+            return None
+        transcript = asyncio.run(self.transcriber.transcribe_audio(audio_data))
+        result = SpeculativeResult(audio_hash=audio_hash, transcript=transcript)
+        if not transcript or cancel_event.is_set():
+            return result if not cancel_event.is_set() else None
+
+        extracted_data = asyncio.run(self.extractor.extract_kg_data(transcript))
+        result.extracted_data = extracted_data
+        if extracted_data is None or cancel_event.is_set():
+            return result if not cancel_event.is_set() else None
+
+        new_persons = identify_new_persons(current_kg, extracted_data.persons)
+        result.new_persons = new_persons
+        if self.partial_commit:
+            # Same split and merge as process_audio_story: only data about known persons is merged right away
+            result.ready_relationships, result.pending_relationships = split_pending_relationships(
+                extracted_data.relationships, pending_person_ids | {p.id for p in new_persons}
+            )
+            confirmed_persons, relationships = [], result.ready_relationships
+        else:
+            confirmed_persons, relationships = new_persons, extracted_data.relationships
+        result.candidate_kg, result.candidate_delta = merge_confirmed_data_with_delta(
+            current_kg=current_kg,
+            confirmed_persons=confirmed_persons,
+            extracted_events=extracted_data.events,
+            extracted_relationships=relationships
+        )
+        result.base_revision = base_revision
+        result.pending_person_ids = pending_person_ids
+        if cancel_event.is_set():
+            return None
+        logging.info(f"Speculative processing finished for input {audio_hash[:8]} ({len(new_persons)} new persons).")
+        return result
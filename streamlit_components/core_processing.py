@@ -3,15 +3,98 @@ import asyncio
 import logging
 from typing import Optional
 
-from src.models import KnowledgeGraph
-from src.persistence import save_kg, save_chat_history
-from src.kg_utils import identify_new_persons, merge_confirmed_data
+from src.config import ENABLE_SPECULATIVE_PROCESSING, SPECULATIVE_WAIT_SECONDS, PARTIAL_COMMIT_MODE
+from src.models import KnowledgeGraph, MergeDelta
+from src.persistence import save_kg, save_chat_history, save_pending_edges
+from src.kg_utils import identify_new_persons, merge_confirmed_data_with_delta, split_pending_relationships, enqueue_pending_edges
+from src.history import GraphHistory
 from src.services.deepgram_service import DeepgramService
 from src.services.instructor_service import InstructorService
+from src.services.backend_router import build_transcriber, build_extractor
+from src.speculative import SpeculativeProcessor, SpeculativeResult
 
 # Instantiate service providers
 deepgram_service = DeepgramService()
 instructor_service = InstructorService()
+# Routers pick remote/local backends per input according to TRANSCRIPTION_BACKEND / EXTRACTION_BACKEND
+transcription_service = build_transcriber(deepgram_service)
+extraction_service = build_extractor(instructor_service)
+
+def _as_bytes(audio_input) -> Optional[bytes]:
+    """st.audio_input/st.file_uploader return UploadedFile objects; the services want raw bytes."""
+    if audio_input is None:
+        return None
+    return audio_input.getvalue() if hasattr(audio_input, 'getvalue') else audio_input
+
+def get_speculative_processor() -> SpeculativeProcessor:
+    """Returns the per-session speculative processor, creating it on first use."""
+    if 'speculative_processor' not in st.session_state:
+        st.session_state.speculative_processor = SpeculativeProcessor(transcription_service, extraction_service)
+    return st.session_state.speculative_processor
+
+@st.cache_resource
+def _shared_graph_history() -> GraphHistory:
+    # One instance per process: every session appends to the same delta log, so they must share its index and lock
+    return GraphHistory()
+
+def get_graph_history() -> GraphHistory:
+    """Returns the versioned history of the knowledge graph, making sure its head matches the loaded graph."""
+    history = _shared_graph_history()
+    if not st.session_state.get('graph_history_checked'):
+        history.ensure_head(st.session_state.knowledge_graph)
+        st.session_state.graph_history_checked = True
+    return history
+
+def commit_knowledge_graph(updated_kg: KnowledgeGraph, delta: Optional[MergeDelta] = None):
+    """
+    Makes updated_kg the current graph and saves it. `delta` is what the merge that produced it added to the
+    current graph: it is recorded in history and applied to the analytics as is. Without one, updated_kg
+    replaced the graph wholesale and is recorded as a snapshot.
+    """
+    previous_kg = st.session_state.knowledge_graph
+    st.session_state.knowledge_graph = updated_kg
+    st.session_state.graph_revision += 1
+    save_kg(updated_kg)
+    if delta is None:
+        get_graph_history().record_snapshot(updated_kg)
+    elif not delta.is_empty():
+        get_graph_history().record_merge(updated_kg, delta)
+    if 'graph_analytics' in st.session_state:
+        st.session_state.graph_analytics.advance(previous_kg, updated_kg, delta)
+
+def discard_speculative_work():
+    """Drops speculative results and the candidate awaiting confirmation, e.g. when the graph is rolled back."""
+    st.session_state.speculative_buffer = None
+    if 'speculative_processor' in st.session_state:
+        st.session_state.speculative_processor.cancel_all()
+
+def undo_knowledge_graph(steps: int):
+    """Rolls the current graph back by `steps` versions and saves it."""
+    discard_speculative_work()
+    st.session_state.knowledge_graph = get_graph_history().undo(st.session_state.knowledge_graph, steps=steps)
+    st.session_state.graph_revision += 1
+    save_kg(st.session_state.knowledge_graph)
+    if 'graph_analytics' in st.session_state:  # Merges are reverted in place, so the analytics can't tell on their own
+        st.session_state.graph_analytics.rebuild(st.session_state.knowledge_graph)
+
+def prefetch_audio_story(*audio_inputs):
+    """
+    Starts transcription and extraction for the upload and/or recording before the user clicks "Process".
+    Safe to call on every rerun: work is keyed by content hash, and only inputs that went away are cancelled.
+    """
+    if not ENABLE_SPECULATIVE_PROCESSING or st.session_state.processing or st.session_state.needs_confirmation:
+        return
+    inputs = [audio_bytes for audio_bytes in map(_as_bytes, audio_inputs) if audio_bytes]
+    if inputs:
+        get_speculative_processor().prefetch(
+            inputs, st.session_state.knowledge_graph, st.session_state.graph_revision, st.session_state.pending_edges.get_person_ids()
+        )
+
+def _get_speculative_result(audio_bytes: Optional[bytes]) -> Optional[SpeculativeResult]:
+    if not ENABLE_SPECULATIVE_PROCESSING or not audio_bytes or 'speculative_processor' not in st.session_state:
+        return None
+    # Bounded, so a stale job still finishing its current stage can't block the script indefinitely
+    return st.session_state.speculative_processor.get(audio_bytes, timeout=SPECULATIVE_WAIT_SECONDS)
 
 def process_audio_story():
     """
@@ -22,10 +105,17 @@ def process_audio_story():
         assistant_response = "Processing failed."  # Default response
         synthesized_audio = None
         processed_successfully = False
-        audio_bytes = st.session_state.audio_bytes_to_process  # Use the stored bytes
+        audio_bytes = _as_bytes(st.session_state.audio_bytes_to_process)  # Use the stored bytes
 
         with st.spinner("Processing story... Transcribing..."):
-            transcribed_text = asyncio.run(deepgram_service.transcribe_audio(audio_bytes))
+            # Reuse (or wait for) speculative work started when the audio first arrived
+            speculative = _get_speculative_result(audio_bytes)
+            if speculative and speculative.transcript:
+                logging.info("Using speculative transcription.")
+                transcribed_text = speculative.transcript
+            else:
+                speculative = None
+                transcribed_text = asyncio.run(transcription_service.transcribe_audio(audio_bytes))
             st.session_state.current_file_processed = True  # Mark as processed inside this block
 
         if transcribed_text:
@@ -39,8 +129,12 @@ def process_audio_story():
             with st.spinner("Extracting information..."):
                 logging.info(f"Starting knowledge graph extraction for text: {transcribed_text[:100]}...")
                 try:
-                    logging.info("Calling extract_kg_data function...")
-                    extracted_data: Optional[KnowledgeGraph] = asyncio.run(instructor_service.extract_kg_data(transcribed_text))
+                    if speculative and speculative.extracted_data is not None:
+                        logging.info("Using speculative extraction.")
+                        extracted_data: Optional[KnowledgeGraph] = speculative.extracted_data
+                    else:
+                        logging.info("Calling extract_kg_data function...")
+                        extracted_data: Optional[KnowledgeGraph] = asyncio.run(extraction_service.extract_kg_data(transcribed_text))
                     if extracted_data is not None:
                         logging.info(f"Knowledge graph extraction completed successfully. Found {len(extracted_data.persons)} persons, {len(extracted_data.events)} events, {len(extracted_data.relationships)} relationships.")
                         if extracted_data.persons:
@@ -60,29 +154,70 @@ def process_audio_story():
                 logging.info(f"Extraction complete. extracted_data is None: {extracted_data is None}")
 
             if extracted_data:
+                # Speculative new persons/candidate merge are only valid if the graph and pending queue haven't changed since
+                speculation_current = speculative is not None and speculative.is_current_for(
+                    st.session_state.graph_revision, st.session_state.pending_edges.get_person_ids()
+                )
+
                 # Identify new persons BEFORE merging anything
-                new_persons = identify_new_persons(st.session_state.knowledge_graph, extracted_data.persons)
+                if speculation_current:
+                    new_persons = speculative.new_persons
+                else:
+                    new_persons = identify_new_persons(st.session_state.knowledge_graph, extracted_data.persons)
+
+                if new_persons and PARTIAL_COMMIT_MODE:
+                    # Merge everything about known people now; queue only what depends on the new persons
+                    if speculation_current:  # The speculative job already split and merged (SpeculativeProcessor.partial_commit)
+                        ready_relationships, pending_relationships = speculative.ready_relationships, speculative.pending_relationships
+                    else:
+                        pending_ids = st.session_state.pending_edges.get_person_ids() | {p.id for p in new_persons}
+                        ready_relationships, pending_relationships = split_pending_relationships(extracted_data.relationships, pending_ids)
+                    st.session_state.pending_edges = enqueue_pending_edges(
+                        st.session_state.pending_edges, new_persons, extracted_data.events, pending_relationships
+                    )
+                    save_pending_edges(st.session_state.pending_edges)  # Persist the queue before the graph so nothing is lost on a crash
 
-                if new_persons:
+                    if speculation_current and speculative.candidate_kg is not None:
+                        updated_kg, delta = speculative.candidate_kg, speculative.candidate_delta
+                    else:
+                        updated_kg, delta = merge_confirmed_data_with_delta(
+                            current_kg=st.session_state.knowledge_graph,
+                            confirmed_persons=[],
+                            extracted_events=extracted_data.events,
+                            extracted_relationships=ready_relationships
+                        )
+                    if not delta.is_empty():
+                        commit_knowledge_graph(updated_kg, delta)
+                        logging.info("Knowledge graph updated with data about known persons; pending edges queued.")
+                    assistant_response = (
+                        f"Okay, I saved what I could from the story. {len(pending_relationships)} relationship(s) are waiting "
+                        f"on you to confirm {len(new_persons)} new person(s)."
+                    )
+                    processed_successfully = True
+
+                elif new_persons:
                     # Need confirmation - store data and set flag
                     st.session_state.needs_confirmation = True
                     st.session_state.new_persons_buffer = new_persons
                     st.session_state.extracted_data_buffer = extracted_data  # Store all extracted data
+                    st.session_state.speculative_buffer = speculative if speculation_current else None
                     logging.info("Extraction complete, pausing for user confirmation.")
                     st.rerun()  # Rerun to display the confirmation form
 
                 else:
                     # No new persons, merge directly (only events and relationships)
                     logging.info("No new persons found, merging events and relationships directly.")
-                    updated_kg = merge_confirmed_data(
-                        current_kg=st.session_state.knowledge_graph,
-                        confirmed_persons=[],  # No new persons to confirm
-                        extracted_events=extracted_data.events,
-                        extracted_relationships=extracted_data.relationships
-                    )
-                    if updated_kg != st.session_state.knowledge_graph:
-                        st.session_state.knowledge_graph = updated_kg
-                        save_kg(st.session_state.knowledge_graph)
+                    if speculation_current and speculative.candidate_kg is not None:
+                        updated_kg, delta = speculative.candidate_kg, speculative.candidate_delta
+                    else:
+                        updated_kg, delta = merge_confirmed_data_with_delta(
+                            current_kg=st.session_state.knowledge_graph,
+                            confirmed_persons=[],  # No new persons to confirm
+                            extracted_events=extracted_data.events,
+                            extracted_relationships=extracted_data.relationships
+                        )
+                    if not delta.is_empty():
+                        commit_knowledge_graph(updated_kg, delta)
                         logging.info("Knowledge graph updated with events/relationships.")
                         st.sidebar.json(st.session_state.knowledge_graph.model_dump(), expanded=False)  # Update sidebar
                         assistant_response = f"Okay, I processed the story and added {len(extracted_data.events)} event(s) and {len(extracted_data.relationships)} relationship(s) to the knowledge graph."
@@ -0,0 +1,66 @@
+import pytest
+from src.models import KnowledgeGraph, MergeDelta, Person, Event, Relationship
+from src.kg_utils import merge_confirmed_data_with_delta
+from src.analytics import GraphAnalytics
+
+def _two_circles_kg() -> KnowledgeGraph:
+    persons = [Person(id=pid, name=pid.title()) for pid in ("alice", "bob", "carol", "dave", "erin")]
+    return KnowledgeGraph(
+        persons=persons,
+        events=[Event(id="book_club", description="Book club")],
+        relationships=[
+            Relationship(source="alice", target="bob", type="KNOWS"),
+            Relationship(source="bob", target="carol", type="KNOWS"),
+            Relationship(source="alice", target="carol", type="KNOWS"),
+            Relationship(source="carol", target="book_club", type="ATTENDED"),
+            Relationship(source="dave", target="book_club", type="ATTENDED"),
+        ]
+    )
+
+def test_degree_pagerank_and_components():
+    analytics = GraphAnalytics(_two_circles_kg())
+
+    assert analytics.most_connected(top_n=1) == [("carol", 3)]
+    ranks = analytics.pagerank()
+    assert abs(sum(ranks.values()) - 1.0) < 1e-6
+    assert max(ranks, key=ranks.get) == "carol"
+    components = analytics.connected_components()
+    assert set(components[0]) == {"alice", "bob", "carol", "dave", "book_club"}
+    assert components[1] == ["erin"]
+
+def test_advance_applies_merge_delta_incrementally():
+    kg = _two_circles_kg()
+    analytics = GraphAnalytics(kg)
+    analytics.pagerank()
+
+    merged, delta = merge_confirmed_data_with_delta(kg, [Person(id="frank", name="Frank")], [], [Relationship(source="erin", target="frank", type="KNOWS")])
+    assert delta.persons == [Person(id="frank", name="Frank")] and len(delta.relationships) == 1
+    analytics.advance(kg, merged, delta)
+    analytics.sync(merged)  # Already there, so nothing to rebuild
+
+    assert analytics.degree()["erin"] == 1
+    assert analytics.degree()["carol"] == 3
+    assert ["erin", "frank"] in [sorted(group) for group in analytics.connected_components()]
+    assert analytics.degree() == GraphAnalytics(merged).degree()
+    assert analytics.pagerank() == pytest.approx(GraphAnalytics(merged).pagerank())
+
+def test_sync_rebuilds_for_another_graph():
+    kg = _two_circles_kg()
+    analytics = GraphAnalytics(kg)
+    analytics.advance(_two_circles_kg(), KnowledgeGraph(), None)  # Not the graph synced: ignored
+    assert analytics.degree()["carol"] == 3
+
+    other = KnowledgeGraph(persons=[Person(id="zoe", name="Zoe")], relationships=[])
+    analytics.sync(other)
+    assert analytics.degree() == {"zoe": 0}
+
+def test_results_are_cached_until_the_next_delta():
+    analytics = GraphAnalytics(_two_circles_kg())
+    assert analytics.connected_components() is not analytics.connected_components()  # Callers get their own copies
+    assert analytics.most_connected(top_n=1) == [("carol", 3)]
+    analytics.pagerank()
+
+    analytics.apply_delta(MergeDelta(persons=[Person(id="zoe", name="Zoe")]))  # A node without edges still changes results
+    assert ["zoe"] in analytics.connected_components()
+    assert "zoe" in analytics.pagerank()
+    assert analytics.most_connected(top_n=10)[-1] == ("zoe", 0)
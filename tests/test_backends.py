@@ -0,0 +1,68 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from src.models import KnowledgeGraph, Person
+from src.services.base import ExtractionBackend
+from src.services.rule_based_extractor import RuleBasedExtractor
+from src.services.backend_router import ExtractionRouter
+
+@pytest.mark.asyncio
+async def test_rule_based_extractor_emits_knowledge_graph():
+    extractor = RuleBasedExtractor(today=date(2026, 10, 19))
+    kg = await extractor.extract_kg_data("I went with Daniel Lomolino to State Street Pub yesterday. We met Sarah there who introduced us to her boyfriend Mike.")
+
+    assert {p.id for p in kg.persons} == {"daniel_lomolino", "sarah", "mike"}
+    assert kg.events[0].id == "state_street_pub"
+    assert kg.events[0].occurred_at == date(2026, 10, 18)
+    rel_tuples = kg.get_relationship_tuples()
+    assert ("sarah", "mike", "DATING") in rel_tuples
+    assert ("mike", "state_street_pub", "ATTENDED") in rel_tuples
+
+def test_rule_based_extractor_skips_sentence_initial_verbs():
+    extractor = RuleBasedExtractor(today=date(2026, 10, 19))
+    assert [p.id for p in extractor.extract("Had coffee with Tom. Loved it.").persons] == ["tom"]
+    assert extractor.extract("Went for a run this morning. Felt great.").persons == []
+    # Names that start a sentence still count when listed, possessive, or used elsewhere in the story
+    assert {p.id for p in extractor.extract("Nina and Leo came over. Emma's friend Ann too. Later Ann left.").persons} == {"nina", "leo", "emma", "ann"}
+
+def _fake_remote(result):
+    remote = MagicMock(spec=ExtractionBackend)
+    remote.name = "remote"
+    remote.is_available.return_value = True
+    remote.extract_kg_data = AsyncMock(return_value=result)
+    return remote
+
+@pytest.mark.asyncio
+async def test_auto_router_keeps_short_stories_local_and_long_ones_remote():
+    remote_kg = KnowledgeGraph(persons=[Person(id="remote", name="Remote")])
+    remote = _fake_remote(remote_kg)
+    router = ExtractionRouter(remote=remote, local=[RuleBasedExtractor()], mode="auto", short_story_words=10)
+
+    short_kg = await router.extract_kg_data("Alice met Bob at the Blue Bottle Cafe.")
+    assert {p.id for p in short_kg.persons} == {"alice", "bob"}
+    remote.extract_kg_data.assert_not_awaited()
+
+    assert await router.extract_kg_data(" ".join(["word"] * 20)) is remote_kg
+
+@pytest.mark.asyncio
+async def test_remote_router_falls_back_to_local_only_when_asked():
+    router = ExtractionRouter(remote=_fake_remote(None), local=[RuleBasedExtractor()], mode="remote")
+    assert await router.extract_kg_data("Alice met Bob at the Blue Bottle Cafe.") is None  # Reported as a failure
+
+    router = ExtractionRouter(remote=_fake_remote(None), local=[RuleBasedExtractor()], mode="remote", local_fallback=True)
+    kg = await router.extract_kg_data("Alice met Bob at the Blue Bottle Cafe.")
+    assert {p.id for p in kg.persons} == {"alice", "bob"}
+
+@pytest.mark.asyncio
+async def test_remote_router_keeps_an_empty_remote_answer():
+    router = ExtractionRouter(remote=_fake_remote(KnowledgeGraph()), local=[RuleBasedExtractor()], mode="remote")
+    kg = await router.extract_kg_data("Went for a run this morning. Felt great.")
+    assert kg == KnowledgeGraph()
+
+def test_unknown_backend_setting_is_rejected(monkeypatch):
+    from src.config import _choice
+    monkeypatch.setenv("EXTRACTION_BACKEND", "Rules")
+    assert _choice("EXTRACTION_BACKEND", "remote", ("remote", "local", "rules", "auto")) == "rules"
+    monkeypatch.setenv("EXTRACTION_BACKEND", "openai")
+    with pytest.raises(ValueError):
+        _choice("EXTRACTION_BACKEND", "remote", ("remote", "local", "rules", "auto"))
@@ -0,0 +1,54 @@
+import pytest
+from datetime import date
+from src.models import KnowledgeGraph, Person, Event, Relationship
+from src.kg_utils import merge_confirmed_data
+from src.graph_io import export_graph, import_graph, convert_graph, import_records, iter_records
+from src.persistence import save_kg, load_kg, iter_saved_kg
+
+@pytest.fixture
+def kg():
+    return merge_confirmed_data(
+        current_kg=KnowledgeGraph(),
+        confirmed_persons=[Person(id="alice", name="Alice"), Person(id="bob", name="Bob O'Neil & Co")],
+        extracted_events=[Event(id="dinner", description="Dinner at <Luigi's>", attendees=["alice", "bob"], occurred_at=date(2026, 3, 14))],
+        extracted_relationships=[
+            Relationship(source="alice", target="bob", type="KNOWS", context='Said "hi", then left'),
+            Relationship(source="bob", target="dinner", type="ATTENDED"),
+        ]
+    )
+
+@pytest.mark.parametrize("target", ["rolodex.jsonl", "neo4j", "rolodex.graphml"])
+def test_export_import_round_trip(kg, tmp_path, target):
+    path = str(tmp_path / target)
+    export_graph(kg, path)
+    imported = import_graph(path, batch_size=2)  # Small batches exercise edges whose nodes came in earlier batches
+
+    assert imported.persons == kg.persons
+    assert imported.events == kg.events
+    assert imported.relationships == kg.relationships
+    assert imported.time_index == kg.time_index
+
+def test_import_merges_into_existing_graph_without_duplicates(kg, tmp_path):
+    jsonl_path = str(tmp_path / "rolodex.jsonl")
+    graphml_path = str(tmp_path / "rolodex.graphml")
+    export_graph(kg, jsonl_path)
+    convert_graph(jsonl_path, graphml_path)
+
+    imported = import_graph(graphml_path, kg=kg)
+    assert imported.get_relationship_tuples() == kg.get_relationship_tuples()
+    assert len(imported.persons) == len(kg.persons)
+
+def test_saved_graph_streams_both_ways_and_imports_in_place(kg, tmp_path):
+    saved = str(tmp_path / "knowledge_graph.json")
+    save_kg(kg, saved)
+    assert list(iter_saved_kg(saved)) == list(iter_records(kg))
+    assert load_kg(saved) == kg
+
+    target = KnowledgeGraph()
+    assert import_records(iter_saved_kg(saved), kg=target, in_place=True) is target
+    assert target.get_relationship_tuples() == kg.get_relationship_tuples()
+
+def test_jsonl_import_skips_invalid_lines(tmp_path):
+    path = tmp_path / "rolodex.jsonl"
+    path.write_text('"oops"\n[1, 2]\n{"kind": "unknown"}\nnot json\n{"kind": "person", "id": "alice", "name": "Alice"}\n')
+    assert import_graph(str(path)).get_person_ids() == {"alice"}
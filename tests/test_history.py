@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+from src.models import KnowledgeGraph, Person, Event, Relationship
+from src.kg_utils import merge_confirmed_data_with_delta
+from src.history import GraphHistory
+
+def _merge_story(history, kg, i):
+    person = Person(id=f"friend_{i}", name=f"Friend {i}")
+    updated, delta = merge_confirmed_data_with_delta(
+        kg, [person], [Event(id=f"event_{i}", description=f"Event {i}")],
+        [Relationship(source=person.id, target=f"event_{i}", type="ATTENDED")]
+    )
+    history.record_merge(updated, delta)
+    return updated
+
+def test_undo_checkout_and_diff(tmp_path):
+    history = GraphHistory(directory=str(tmp_path), snapshot_interval=3, retain_versions=100)
+    graphs = [KnowledgeGraph()]
+    for i in range(7):
+        graphs.append(_merge_story(history, graphs[-1], i))
+    assert history.head_version == 7
+
+    for version in (0, 2, 3, 5, 7):
+        assert history.checkout(version) == graphs[version]
+
+    diff = history.diff(2, 4)
+    assert [p.id for p in diff.added.persons] == ["friend_2", "friend_3"]
+    assert [p.id for p in history.diff(4, 2).removed.persons] == ["friend_2", "friend_3"]
+
+    head = graphs[7].model_copy(deep=True)
+    undone = history.undo(head, steps=2)
+    assert undone is head  # Reverted in place
+    assert undone == graphs[5]
+    assert history.head_version == 5
+    # History continues linearly after an undo
+    redone = _merge_story(history, undone, 99)
+    assert history.checkout(6) == redone
+
+def test_snapshots_and_compaction_bound_disk_usage(tmp_path):
+    history = GraphHistory(directory=str(tmp_path), snapshot_interval=5, retain_versions=10)
+    kg = KnowledgeGraph()
+    for i in range(40):
+        kg = _merge_story(history, kg, i)
+
+    assert history.head_version == 40
+    assert history.base_version >= 40 - 10 - 5
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("snapshot_")]) <= 3
+    assert history.checkout(history.base_version).persons == kg.persons[:history.base_version]
+
+    reopened = GraphHistory(directory=str(tmp_path), snapshot_interval=5, retain_versions=10)
+    assert reopened.checkout(40) == kg
+    reopened.ensure_head(kg)
+    assert reopened.head_version == 40
+
+def test_hand_edits_are_recorded_at_startup(tmp_path):
+    history = GraphHistory(directory=str(tmp_path / "history"))
+    kg = _merge_story(history, KnowledgeGraph(), 0)
+
+    reloaded = KnowledgeGraph(**json.loads(json.dumps(kg.model_dump(mode="json"))))
+    history.ensure_head(reloaded)
+    assert history.head_version == 1
+
+    # Same counts, different content
+    edited = reloaded.model_copy(update={"persons": [Person(id="friend_0", name="Renamed Friend")]})
+    history.ensure_head(edited)
+    assert history.head_version == 2
+    assert history.undo(edited) == kg
+
+def test_concurrent_sessions_get_distinct_versions(tmp_path):
+    history = GraphHistory(directory=str(tmp_path), snapshot_interval=1000)
+
+    def session(n):
+        kg = KnowledgeGraph()
+        for i in range(10):
+            kg = _merge_story(history, kg, n * 100 + i)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert history.head_version == 40
+    assert [entry.version for entry in reversed(history.entries(limit=40))] == list(range(1, 41))
@@ -1,7 +1,10 @@
+import json
 import pytest
+from datetime import date
 from unittest.mock import AsyncMock, patch
-from src.models import KnowledgeGraph, Person, Event, Relationship
-from src.kg_utils import identify_new_persons, merge_confirmed_data
+from src.models import KnowledgeGraph, PendingEdges, Person, Event, Relationship
+from src.kg_utils import identify_new_persons, merge_confirmed_data, split_pending_relationships, enqueue_pending_edges, resolve_pending_edges
+from src.kg_utils import GraphMerger, events_between, relationships_between, persons_met_between
 from src.services.instructor_service import InstructorService
 
 @pytest.mark.asyncio
@@ -55,4 +58,67 @@ async def test_kg_creation_with_canned_transcription():
         rel_types = {(r.source, r.target, r.type) for r in merged_kg.relationships}
         assert ("alice", "bob", "KNOWS") in rel_types
         assert ("alice", "blue_bottle_cafe_meeting", "ATTENDED") in rel_types
-        assert ("carol", "blue_bottle_cafe_meeting", "ATTENDED") in rel_types 
\ No newline at end of file
+        assert ("carol", "blue_bottle_cafe_meeting", "ATTENDED") in rel_types 
+
+def test_partial_commit_merges_known_edges_and_queues_pending():
+    current_kg = KnowledgeGraph(persons=[Person(id="alice", name="Alice"), Person(id="bob", name="Bob")])
+    extracted_kg = KnowledgeGraph(
+        persons=[Person(id="alice", name="Alice"), Person(id="bob", name="Bob"), Person(id="dave", name="Dave")],
+        events=[Event(id="hike", description="Hike up the ridge", attendees=["alice", "dave"])],
+        relationships=[
+            Relationship(source="alice", target="bob", type="KNOWS"),
+            Relationship(source="alice", target="hike", type="ATTENDED"),
+            Relationship(source="dave", target="hike", type="ATTENDED"),
+            Relationship(source="alice", target="dave", type="KNOWS"),
+        ]
+    )
+
+    new_persons = identify_new_persons(current_kg, extracted_kg.persons)
+    ready, pending = split_pending_relationships(extracted_kg.relationships, {p.id for p in new_persons})
+    queue = enqueue_pending_edges(PendingEdges(), new_persons, extracted_kg.events, pending)
+    partial_kg = merge_confirmed_data(current_kg, [], extracted_kg.events, ready)
+
+    assert partial_kg.get_relationship_tuples() == {("alice", "bob", "KNOWS"), ("alice", "hike", "ATTENDED")}
+    assert queue.get_person_ids() == {"dave"}
+    assert len(queue.relationships) == 2
+    assert [e.id for e in queue.events] == ["hike"]
+
+    # Enqueuing the same story again does not duplicate anything
+    queue = enqueue_pending_edges(queue, new_persons, extracted_kg.events, pending)
+    assert len(queue.persons) == 1 and len(queue.relationships) == 2 and len(queue.events) == 1
+
+    confirmed_kg, _ = resolve_pending_edges(partial_kg, queue, confirmed_persons=new_persons)
+    assert ("dave", "hike", "ATTENDED") in confirmed_kg.get_relationship_tuples()
+    rejected_kg, rejected_delta = resolve_pending_edges(partial_kg, queue, confirmed_persons=[])
+    assert rejected_kg.get_relationship_tuples() == partial_kg.get_relationship_tuples()
+    assert not rejected_delta.relationships
+
+def test_time_index_is_updated_by_merge_and_supports_range_queries():
+    kg = merge_confirmed_data(
+        current_kg=KnowledgeGraph(),
+        confirmed_persons=[Person(id="alice", name="Alice"), Person(id="bob", name="Bob")],
+        extracted_events=[
+            Event(id="ski_trip", description="Ski trip", attendees=["alice"], occurred_at=date(2026, 1, 10)),
+            Event(id="bbq", description="Backyard BBQ", occurred_at=date(2026, 7, 4)),
+        ],
+        extracted_relationships=[Relationship(source="bob", target="bbq", type="ATTENDED")]
+    )
+    # Merge events out of date order to check the index stays sorted
+    kg = merge_confirmed_data(kg, [], [Event(id="new_year", description="New Year party", occurred_at=date(2026, 1, 1))], [])
+
+    assert [e.id for e in events_between(kg, date(2026, 1, 1), date(2026, 1, 31))] == ["new_year", "ski_trip"]
+    assert [p.id for p in persons_met_between(kg, date(2026, 7, 1), date(2026, 7, 31))] == ["bob"]
+    assert len(relationships_between(kg, kg.relationships[0].ingested_at, kg.relationships[0].ingested_at)) == 1
+
+    # Lookups persist across queries and are extended, not rebuilt, by later merges
+    lookup = kg.lookup()
+    GraphMerger(kg).merge([], [Event(id="picnic", description="Picnic", attendees=["alice"], occurred_at=date(2026, 7, 20))], [])
+    assert kg.lookup() is lookup
+    assert [p.id for p in persons_met_between(kg, date(2026, 7, 1), date(2026, 7, 31))] == ["alice", "bob"]
+    # Direct edits the merge helpers didn't see are caught when a position no longer holds its key
+    kg.events[0], kg.events[2] = kg.events[2], kg.events[0]
+    assert [e.id for e in events_between(kg, date(2026, 1, 1), date(2026, 1, 31))] == ["new_year", "ski_trip"]
+
+    # The index round-trips through the persisted JSON
+    reloaded = KnowledgeGraph(**json.loads(json.dumps(kg.model_dump(mode="json"))))
+    assert reloaded.time_index == kg.time_index
@@ -0,0 +1,43 @@
+import pytest
+from datetime import datetime, timezone
+from src.models import KnowledgeGraph, Person
+from src.kg_utils import GraphMerger, identify_new_persons
+from src.parallel_merge import ParallelMerger
+
+INGESTED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def _fragments():
+    return [
+        # Edge to a person who only appears in a later fragment: dropped, as in a serial merge
+        {"persons": [{"id": "x", "name": "Alice Smith"}], "events": [],
+         "relationships": [{"source": "alice_smith", "target": "bob", "type": "knows"}]},
+        {"persons": [{"id": "bob", "name": "Bob"}, {"id": "b", "name": "BOB"}],
+         "events": [{"id": "Lunch Date", "description": "Lunch", "attendees": ["bob"]}],
+         "relationships": [{"source": "Bob", "target": "lunch_date", "type": "attended"},
+                           {"source": "alice_smith", "target": "bob", "type": "KNOWS", "context": "second mention"}]},
+        {"persons": "not a list"},  # Invalid fragments are skipped
+        {"persons": [{"id": "carol", "name": "Carol"}, {"id": "dan", "name": "Dan"}],
+         "events": [{"id": "", "description": "A very long description of a hike in the hills"}],
+         "relationships": [{"source": "carol", "target": "a_very_long_description_of_a", "type": "ATTENDED"},
+                           {"source": "bob", "target": "lunch_date", "type": "ATTENDED"}]},
+    ]
+
+def _serial_merge(kg, fragments):
+    merger = GraphMerger(kg.model_copy(deep=True), log_items=False)
+    for data in fragments:
+        try:
+            fragment = KnowledgeGraph.model_validate(data)
+        except ValueError:
+            continue
+        merger.merge(identify_new_persons(merger.kg, fragment.persons), fragment.events, fragment.relationships, ingested_at=INGESTED_AT)
+    return merger.kg
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_merge_matches_serial_merge(workers):
+    current_kg = KnowledgeGraph(persons=[Person(id="dan", name="Dan")])
+    expected = _serial_merge(current_kg, _fragments())
+    merged = ParallelMerger(workers=workers, shards_per_worker=2).merge(current_kg, _fragments(), ingested_at=INGESTED_AT)
+
+    assert merged == expected
+    assert ("alice_smith", "bob", "KNOWS") in merged.get_relationship_tuples()
+    assert [p.id for p in merged.persons] == ["dan", "alice_smith", "bob", "carol"]
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from src.models import KnowledgeGraph, Person, Event, Relationship
+from src.speculative import SpeculativeProcessor
+
+def _make_services():
+    extracted_kg = KnowledgeGraph(
+        persons=[Person(id="alice", name="Alice"), Person(id="bob", name="Bob")],
+        events=[Event(id="lunch", description="Lunch downtown", attendees=["alice", "bob"])],
+        relationships=[Relationship(source="alice", target="bob", type="KNOWS", context="Had lunch")],
+    )
+    transcriber = MagicMock()
+    transcriber.transcribe_audio = AsyncMock(return_value="Alice and Bob had lunch downtown.")
+    extractor = MagicMock()
+    extractor.extract_kg_data = AsyncMock(return_value=extracted_kg)
+    return transcriber, extractor
+
+def test_speculative_result_is_ready_and_cached():
+    transcriber, extractor = _make_services()
+    processor = SpeculativeProcessor(transcriber, extractor, partial_commit=False)
+    current_kg = KnowledgeGraph(persons=[Person(id="alice", name="Alice")])
+
+    processor.submit(b"story-audio", current_kg, revision=3)
+    processor.submit(b"story-audio", current_kg, revision=3)  # Same content is not processed twice
+    result = processor.get(b"story-audio", timeout=5)
+
+    assert result is not None
+    assert result.transcript == "Alice and Bob had lunch downtown."
+    assert [p.id for p in result.new_persons] == ["bob"]
+    assert result.is_current_for(3)
+    assert not result.is_current_for(4)
+    assert {p.id for p in result.candidate_kg.persons} == {"alice", "bob"}
+    assert result.candidate_delta.persons == [Person(id="bob", name="Bob")]
+    assert transcriber.transcribe_audio.await_count == 1
+
+def test_partial_commit_split_and_ready_merge_are_precomputed():
+    transcriber, extractor = _make_services()
+    processor = SpeculativeProcessor(transcriber, extractor, partial_commit=True)
+    current_kg = KnowledgeGraph(persons=[Person(id="alice", name="Alice")])
+
+    processor.submit(b"story-audio", current_kg, revision=2, pending_person_ids={"carol"})
+    result = processor.get(b"story-audio", timeout=5)
+
+    assert result.is_current_for(2, {"carol"})
+    assert not result.is_current_for(2)  # The queue changed since
+    assert [(r.source, r.target) for r in result.pending_relationships] == [("alice", "bob")]
+    assert result.ready_relationships == []
+    assert result.candidate_kg.get_person_ids() == {"alice"}  # New persons wait for confirmation
+    assert result.candidate_delta.events[0].id == "lunch"
+
+def test_speculative_cache_is_bounded():
+    transcriber, extractor = _make_services()
+    processor = SpeculativeProcessor(transcriber, extractor, max_entries=2)
+    current_kg = KnowledgeGraph()
+
+    for audio in (b"first", b"second", b"third"):
+        processor.submit(audio, current_kg)
+        processor.get(audio, timeout=5)
+
+    assert processor.get(b"first") is None
+    assert processor.get(b"third") is not None
+
+def test_prefetch_keeps_every_current_input_and_waits_are_bounded():
+    transcriber, extractor = _make_services()
+
+    async def slow_transcription(audio_data):
+        await asyncio.sleep(0.2)
+        return "Alice and Bob had lunch downtown."
+    transcriber.transcribe_audio = AsyncMock(side_effect=slow_transcription)
+    processor = SpeculativeProcessor(transcriber, extractor)
+    current_kg = KnowledgeGraph()
+
+    # A recording and an upload at the same time: neither cancels the other
+    processor.prefetch([b"recording", b"upload"], current_kg)
+    assert processor.get(b"recording", timeout=5) is not None
+    assert processor.get(b"upload", timeout=5) is not None
+
+    processor.submit(b"new-recording", current_kg)
+    assert processor.get(b"new-recording", timeout=0.01) is None  # Caller falls back to direct processing
+
+def test_worker_uses_the_graph_as_it_was_at_submit():
+    transcriber, extractor = _make_services()
+
+    async def slow_transcription(audio_data):
+        await asyncio.sleep(0.2)
+        return "Alice and Bob had lunch downtown."
+    transcriber.transcribe_audio = AsyncMock(side_effect=slow_transcription)
+    processor = SpeculativeProcessor(transcriber, extractor)
+    current_kg = KnowledgeGraph(persons=[Person(id="alice", name="Alice")])
+
+    processor.submit(b"story-audio", current_kg, revision=1)
+    del current_kg.persons[:]  # e.g. an undo while the job runs
+    result = processor.get(b"story-audio", timeout=5)
+
+    assert [p.id for p in result.new_persons] == ["bob"]
+    assert result.is_current_for(1)